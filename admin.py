@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Student, AcademicRecord, StudentBehavior, Prediction
+from .models import (
+    Student, AcademicRecord, StudentBehavior, Prediction, Job, ModelVersion,
+    PerformanceSummary, ClusterSummary, AnalyticsCounter,
+)
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
@@ -18,5 +21,29 @@ class StudentBehaviorAdmin(admin.ModelAdmin):
 
 @admin.register(Prediction)
 class PredictionAdmin(admin.ModelAdmin):
-    list_display = ['student', 'predicted_performance', 'confidence_score', 'created_at']
+    list_display = ['student', 'predicted_performance', 'confidence_score', 'model_version', 'created_at']
     list_filter = ['predicted_performance', 'created_at']
+    list_select_related = ['student', 'model_version']
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'progress', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
+
+@admin.register(ModelVersion)
+class ModelVersionAdmin(admin.ModelAdmin):
+    list_display = ['id', 'accuracy', 'training_data_hash', 'is_active', 'created_at']
+    list_filter = ['is_active']
+
+@admin.register(PerformanceSummary)
+class PerformanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ['semester', 'admission_year', 'performance_category', 'record_count']
+    list_filter = ['performance_category', 'semester', 'admission_year']
+
+@admin.register(ClusterSummary)
+class ClusterSummaryAdmin(admin.ModelAdmin):
+    list_display = ['model_version', 'cluster_group', 'student_count']
+
+@admin.register(AnalyticsCounter)
+class AnalyticsCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value']
@@ -0,0 +1,175 @@
+from django.core.cache import cache
+from django.db.models import Sum
+
+from .ml_algorithms import PERFORMANCE_THRESHOLDS, DEFAULT_PERFORMANCE_CATEGORY
+from .association_mining import mine_store
+from .models import ModelVersion, PerformanceSummary, ClusterSummary
+from .summaries import get_counter, STUDENTS_COUNTER, PREDICTIONS_COUNTER
+from .warehouse import transaction_store
+
+PERFORMANCE_CATEGORIES = [label for _, label in PERFORMANCE_THRESHOLDS] + [DEFAULT_PERFORMANCE_CATEGORY]
+
+CACHE_TIMEOUT = 300
+GENERATION_KEY = 'analytics:aggregates:generation'
+
+
+def _generation():
+    return cache.get_or_set(GENERATION_KEY, 1, None)
+
+
+def invalidate_aggregates():
+    """Drop every cached aggregate; call after ingesting data or promoting a model"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def cached_aggregate(name):
+    """Cache a function's result under a key that changes on every invalidation"""
+    def decorator(func):
+        def wrapper(*args):
+            key = ':'.join(['analytics:aggregates', name, str(_generation())] + [str(arg) for arg in args])
+            value = cache.get(key)
+            if value is None:
+                value = func(*args)
+                cache.set(key, value, CACHE_TIMEOUT)
+            return value
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    return decorator
+
+
+def _template_key(category):
+    # Templates cannot look up keys containing spaces ('First Class' -> 'First_Class')
+    return category.replace(' ', '_')
+
+
+@cached_aggregate('performance_distribution')
+def performance_distribution():
+    """Number of academic records in each performance category"""
+    counts = dict(
+        PerformanceSummary.objects.values_list('performance_category').annotate(count=Sum('record_count')).order_by()
+    )
+    return {_template_key(category): counts.get(category, 0) for category in PERFORMANCE_CATEGORIES}
+
+
+@cached_aggregate('overview')
+def overview_stats():
+    """Headline numbers for the home page"""
+    totals = PerformanceSummary.objects.aggregate(records=Sum('record_count'), cgpa=Sum('cgpa_sum'))
+    active = ModelVersion.objects.filter(is_active=True).order_by('-pk').first()
+
+    return {
+        'total_students': get_counter(STUDENTS_COUNTER),
+        'total_predictions': get_counter(PREDICTIONS_COUNTER),
+        'avg_cgpa': round(totals['cgpa'] / totals['records'], 2) if totals['records'] else 0.0,
+        'classification_accuracy': round(active.accuracy * 100, 1) if active and active.accuracy is not None else 0.0,
+    }
+
+
+def _cluster_tier(rank, n_clusters):
+    if rank == 0:
+        return 'high', 'High Performers'
+    if rank == n_clusters - 1:
+        return 'low', 'Low Performers'
+    return 'average', 'Average Performers' if n_clusters == 3 else f'Average Performers {rank}'
+
+
+def _cluster_characteristics(avg_attendance):
+    if avg_attendance >= 90:
+        return ['High attendance (>90%)', 'Regular study habits']
+    if avg_attendance >= 70:
+        return ['Moderate attendance (70-90%)', 'Average study time']
+    return ['Low attendance (<70%)', 'Irregular study patterns', 'Need intervention']
+
+
+@cached_aggregate('cluster_stats')
+def cluster_stats():
+    """Size and averages of each k-means cluster under the active model
+
+    Sizes count distinct students by the latest prediction each one has
+    under the model version, so rescoring a cohort moves students rather
+    than adding to them.
+    """
+    active = ModelVersion.objects.filter(is_active=True).order_by('-pk').first()
+    if active is None:
+        return []
+
+    rows = [
+        {
+            'cluster_group': summary.cluster_group,
+            'count': summary.student_count,
+            'avg_cgpa': summary.cgpa_sum / summary.student_count if summary.student_count else 0.0,
+            'avg_attendance': summary.attendance_sum / summary.student_count if summary.student_count else 0.0,
+        }
+        for summary in ClusterSummary.objects.filter(model_version=active)
+    ]
+    rows.sort(key=lambda row: row['avg_cgpa'], reverse=True)
+
+    clusters = []
+    for rank, row in enumerate(rows):
+        tier, name = _cluster_tier(rank, len(rows))
+        avg_cgpa = round(row['avg_cgpa'], 2)
+        avg_attendance = round(row['avg_attendance'], 1)
+        clusters.append({
+            'id': row['cluster_group'],
+            'name': name,
+            'tier': tier,
+            'count': row['count'],
+            'avg_cgpa': avg_cgpa,
+            'cgpa_percent': round(avg_cgpa / 4.0 * 100),
+            'avg_attendance': avg_attendance,
+            'characteristics': _cluster_characteristics(avg_attendance),
+        })
+    return clusters
+
+
+@cached_aggregate('cluster_selection')
+def cluster_selection():
+    """How the active model's number of clusters was chosen, or None for a fixed k"""
+    active = ModelVersion.objects.filter(is_active=True).order_by('-pk').first()
+    if active is None or not active.metadata.get('cluster_selection'):
+        return None
+
+    selection = active.metadata['cluster_selection']
+    return {
+        'k': selection['k'],
+        'criterion': selection['criterion'],
+        'candidates': [
+            {
+                'k': row['k'],
+                'inertia': round(row['inertia'], 1),
+                'silhouette': round(row['silhouette'], 3),
+                'min_cluster_size': row['min_cluster_size'],
+                'chosen': row['k'] == selection['k'],
+            }
+            for row in selection['diagnostics']
+        ],
+    }
+
+
+@cached_aggregate('feature_importance')
+def feature_importance():
+    """Decision-tree feature importances of the active model, largest first"""
+    active = ModelVersion.objects.filter(is_active=True).order_by('-pk').first()
+    if active is None:
+        return []
+
+    importances = active.metadata.get('feature_importance', {})
+    return [
+        {'feature': feature.replace('_', ' ').title(), 'importance': round(value * 100, 1)}
+        for feature, value in sorted(importances.items(), key=lambda item: item[1], reverse=True)
+    ]
+
+
+@cached_aggregate('association_rules')
+def association_rules(min_support, min_confidence, min_lift, max_rules):
+    """Association rules mined from every student's latest records"""
+    store = transaction_store()
+    if store.n_rows == 0:
+        return []
+    return mine_store(
+        store, min_support=min_support, min_confidence=min_confidence, min_lift=min_lift, max_rules=max_rules,
+    )
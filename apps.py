@@ -1,5 +1,25 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
+
+def _serves_requests():
+    """False under management commands other than runserver, which must not pick up jobs"""
+    if os.path.basename(sys.argv[0]) not in ('manage.py', 'django-admin'):
+        return True
+    if sys.argv[1:2] != ['runserver']:
+        return False
+    # runserver's autoreloader parent only watches files; its child serves
+    return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+
+
 class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analytics'
+
+    def ready(self):
+        # Recover jobs left behind by dead workers as soon as a serving process starts
+        if _serves_requests():
+            from .jobs import get_job_queue
+            get_job_queue().start()
@@ -0,0 +1,242 @@
+"""
+Frequent itemset and association rule mining over discretized student attributes
+Implements Apriori with vertical (column-wise) support counting: every item
+is stored as a packed bitset over students, and a candidate's support is a
+single AND of two bitsets followed by a popcount.
+"""
+from itertools import combinations
+import math
+
+import numpy as np
+import pandas as pd
+
+from .data_loading import factorize_labels, parse_flags
+
+# Numeric attributes are split into bands: (lower bound, item label)
+ATTRIBUTE_BANDS = {
+    'attendance': [
+        (0, 'Low Attendance (<70%)'),
+        (70, 'Moderate Attendance (70-85%)'),
+        (85, 'High Attendance (>=85%)'),
+    ],
+    'study_hours': [
+        (0, 'Low Study Hours (<2)'),
+        (2, 'Moderate Study Hours (2-4)'),
+        (4, 'High Study Hours (>=4)'),
+    ],
+    'social_media_hours': [
+        (0, 'Low Social Media (<2h)'),
+        (2, 'Moderate Social Media (2-4h)'),
+        (4, 'High Social Media (>=4h)'),
+    ],
+}
+
+# Yes/No attributes become two items each
+FLAG_ITEMS = {
+    'co_curricular': ('Co-curricular Activities', 'No Co-curricular Activities'),
+    'scholarship': ('Scholarship', 'No Scholarship'),
+}
+
+PERFORMANCE_GROUP = 'performance'
+GOOD_PERFORMANCE_CATEGORIES = ('Distinction', 'First Class')
+
+
+def _iter_item_masks(df):
+    """Yield (item label, attribute group, boolean row mask) for every item"""
+    for attribute, bands in ATTRIBUTE_BANDS.items():
+        if attribute not in df.columns:
+            continue
+        # float32 holds every band edge exactly, and compact integer columns convert without a float64 copy
+        values = pd.to_numeric(df[attribute], errors='coerce').to_numpy(dtype=np.float32)
+        edges = np.array([lower for lower, _ in bands[1:]])
+        codes = np.searchsorted(edges, values, side='right')
+        known = ~np.isnan(values)
+        for code, (_, label) in enumerate(bands):
+            yield label, attribute, known & (codes == code)
+
+    for attribute, (yes_label, no_label) in FLAG_ITEMS.items():
+        if attribute not in df.columns:
+            continue
+        flags = parse_flags(df[attribute]).to_numpy()
+        yield yes_label, attribute, flags
+        yield no_label, attribute, ~flags
+
+    if 'Performance_Category' in df.columns:
+        codes, categories = factorize_labels(df['Performance_Category'])
+        for code in pd.unique(codes):
+            yield f'{categories[code]} Performance', PERFORMANCE_GROUP, codes == code
+        yield 'Good Performance', PERFORMANCE_GROUP, np.isin(categories, GOOD_PERFORMANCE_CATEGORIES)[codes]
+
+
+def encode_transactions(df):
+    """
+    Turn a student frame into a boolean item matrix
+    Returns (matrix, items, groups): matrix[i, j] is True when student i has
+    item j, and groups[j] names the attribute item j came from.
+    """
+    encoded = list(_iter_item_masks(df))
+    if not encoded:
+        return np.zeros((len(df), 0), dtype=bool), [], []
+    items, groups, masks = zip(*encoded)
+    return np.column_stack(masks), list(items), list(groups)
+
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words):
+        """Number of set bits in a uint64 array"""
+        return int(np.bitwise_count(words).sum())
+else:
+    _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """Number of set bits in a uint64 array"""
+        return int(_BYTE_POPCOUNT[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+def pack_mask(mask):
+    """Pack a boolean row mask into uint64 words (one bit per student)"""
+    packed = np.packbits(mask)
+    words = np.zeros((len(packed) + 7) // 8 * 8, dtype=np.uint8)
+    words[:len(packed)] = packed
+    return words.view(np.uint64)
+
+
+class TransactionStore:
+    """
+    Vertical transaction database: one packed bitset per item
+    Uses one bit per student and item, 8x less memory than a boolean frame.
+    Items of the same group are never combined in one itemset.
+    """
+
+    def __init__(self, n_rows, items, groups, bitsets):
+        self.n_rows = n_rows
+        self.items = list(items)
+        self.groups = list(groups)
+        self.bitsets = list(bitsets)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build the store item by item, packing each mask as soon as it is computed"""
+        items, groups, bitsets = [], [], []
+        for label, group, mask in _iter_item_masks(df):
+            items.append(label)
+            groups.append(group)
+            bitsets.append(pack_mask(mask))
+        return cls(len(df), items, groups, bitsets)
+
+    @classmethod
+    def from_matrix(cls, matrix, items, groups):
+        return cls(matrix.shape[0], items, groups, [pack_mask(matrix[:, j]) for j in range(matrix.shape[1])])
+
+    @property
+    def nbytes(self):
+        return sum(bitset.nbytes for bitset in self.bitsets)
+
+    def support_count(self, itemset):
+        """Number of students containing every item of the itemset"""
+        words = self.bitsets[itemset[0]]
+        for item in itemset[1:]:
+            words = words & self.bitsets[item]
+        return popcount(words)
+
+
+def frequent_itemsets(store, min_support=0.05, max_len=3):
+    """
+    Level-wise Apriori search over a TransactionStore
+    Returns {itemset (tuple of item indices): support count}.
+    """
+    if store.n_rows == 0:
+        return {}
+    min_count = max(1, math.ceil(min_support * store.n_rows))
+    groups = store.groups
+
+    counts = [popcount(bitset) for bitset in store.bitsets]
+    level = {(j,): store.bitsets[j] for j in range(len(counts)) if counts[j] >= min_count}
+    supports = {itemset: counts[itemset[0]] for itemset in level}
+
+    size = 1
+    while level and size < max_len:
+        next_level = {}
+        keys = sorted(level)
+        for position, left in enumerate(keys):
+            for right in keys[position + 1:]:
+                # Sorted keys keep itemsets with the same prefix together
+                if left[:-1] != right[:-1]:
+                    break
+                if groups[left[-1]] == groups[right[-1]]:
+                    continue
+
+                candidate = left + (right[-1],)
+                # Every subset of a frequent itemset must be frequent
+                if any(candidate[:i] + candidate[i + 1:] not in level for i in range(len(candidate) - 2)):
+                    continue
+
+                words = level[left] & store.bitsets[right[-1]]
+                count = popcount(words)
+                if count >= min_count:
+                    next_level[candidate] = words
+                    supports[candidate] = count
+        level = next_level
+        size += 1
+
+    return supports
+
+
+def _interpretation(confidence):
+    if confidence > 0.7:
+        return 'Strong relationship'
+    if confidence > 0.5:
+        return 'Moderate relationship'
+    return 'Weak relationship'
+
+
+def association_rules(supports, items, groups, n_rows, min_confidence=0.5, min_lift=1.0,
+                      consequent_groups=None, max_rules=None):
+    """Derive rules A -> C from frequent itemsets, strongest lift first"""
+    rules = []
+    for itemset, count in supports.items():
+        if len(itemset) < 2:
+            continue
+        for size in range(1, len(itemset)):
+            for antecedent in combinations(itemset, size):
+                consequent = tuple(i for i in itemset if i not in antecedent)
+                if consequent_groups and not all(groups[i] in consequent_groups for i in consequent):
+                    continue
+
+                confidence = count / supports[antecedent]
+                lift = confidence / (supports[consequent] / n_rows)
+                if confidence < min_confidence or lift < min_lift:
+                    continue
+
+                rules.append({
+                    'antecedent': ' & '.join(items[i] for i in antecedent),
+                    'consequent': ' & '.join(items[i] for i in consequent),
+                    'support': count / n_rows,
+                    'confidence': confidence,
+                    'lift': lift,
+                    'interpretation': _interpretation(confidence),
+                })
+
+    rules.sort(key=lambda rule: (rule['lift'], rule['confidence']), reverse=True)
+    return rules[:max_rules] if max_rules else rules
+
+
+def mine_association_rules(df, min_support=0.05, min_confidence=0.5, min_lift=1.0, max_len=3,
+                           consequent_groups=(PERFORMANCE_GROUP,), max_rules=None):
+    """Discretize a student frame and mine association rules from it"""
+    return mine_store(
+        TransactionStore.from_frame(df),
+        min_support=min_support, min_confidence=min_confidence, min_lift=min_lift, max_len=max_len,
+        consequent_groups=consequent_groups, max_rules=max_rules,
+    )
+
+
+def mine_store(store, min_support=0.05, min_confidence=0.5, min_lift=1.0, max_len=3,
+               consequent_groups=(PERFORMANCE_GROUP,), max_rules=None):
+    """Mine association rules from an already built TransactionStore"""
+    supports = frequent_itemsets(store, min_support=min_support, max_len=max_len)
+    return association_rules(
+        supports, store.items, store.groups, store.n_rows,
+        min_confidence=min_confidence, min_lift=min_lift,
+        consequent_groups=consequent_groups, max_rules=max_rules,
+    )
@@ -0,0 +1,278 @@
+"""
+Performance benchmarks for the student analytics pipeline
+Run with: python -m analytics.benchmarks
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from .ml_algorithms import StudentPerformanceAnalyzer
+from .association_mining import TransactionStore, encode_transactions, frequent_itemsets, mine_association_rules
+from .data_loading import optimize_dtypes
+from .synthetic_data import generate_students
+from .compiled_tree import CompiledTree
+from sklearn.tree import DecisionTreeClassifier
+
+
+def _best_time(func, repeat):
+    """Return the fastest wall-clock time of `repeat` calls to func"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_categorization(n_rows=500_000, repeat=3, seed=42):
+    """Compare the row-wise apply path against the vectorized categorization"""
+    rng = np.random.default_rng(seed)
+    cgpa = pd.Series(rng.uniform(0.0, 4.0, n_rows).round(2))
+    cgpa[rng.random(n_rows) < 0.01] = np.nan
+
+    analyzer = StudentPerformanceAnalyzer()
+
+    apply_seconds = _best_time(lambda: cgpa.apply(analyzer.categorize_performance), repeat)
+    vectorized_seconds = _best_time(lambda: analyzer.categorize_performance_vectorized(cgpa), repeat)
+
+    expected = cgpa.apply(analyzer.categorize_performance)
+    actual = pd.Series(analyzer.categorize_performance_vectorized(cgpa)).astype(object)
+
+    return {
+        'rows': n_rows,
+        'apply_seconds': apply_seconds,
+        'vectorized_seconds': vectorized_seconds,
+        'speedup': apply_seconds / vectorized_seconds if vectorized_seconds > 0 else float('inf'),
+        'labels_match': bool((expected.values == actual.values).all()),
+    }
+
+
+def _synthetic_transactions(n_rows, rng):
+    return pd.DataFrame({
+        'attendance': rng.uniform(40, 100, n_rows),
+        'study_hours': rng.uniform(0, 6, n_rows),
+        'social_media_hours': rng.uniform(0, 6, n_rows),
+        'co_curricular': rng.choice(['Yes', 'No'], n_rows),
+        'scholarship': rng.choice(['Yes', 'No'], n_rows),
+        'Performance_Category': rng.choice(['Distinction', 'First Class', 'Second Class', 'Pass'], n_rows),
+    })
+
+
+def benchmark_support_counting(n_rows=1_000_000, min_support=0.02, repeat=3, seed=42):
+    """Compare boolean-matrix support counting against packed bitsets for all frequent itemsets"""
+    rng = np.random.default_rng(seed)
+    df = _synthetic_transactions(n_rows, rng)
+
+    matrix, _, _ = encode_transactions(df)
+    store = TransactionStore.from_frame(df)
+    supports = frequent_itemsets(store, min_support=min_support)
+
+    def count_boolean():
+        return {itemset: int(np.count_nonzero(matrix[:, list(itemset)].all(axis=1))) for itemset in supports}
+
+    def count_packed():
+        return {itemset: store.support_count(itemset) for itemset in supports}
+
+    boolean_seconds = _best_time(count_boolean, repeat)
+    packed_seconds = _best_time(count_packed, repeat)
+
+    return {
+        'rows': n_rows,
+        'itemsets': len(supports),
+        'boolean_bytes': matrix.nbytes,
+        'packed_bytes': store.nbytes,
+        'boolean_seconds': boolean_seconds,
+        'packed_seconds': packed_seconds,
+        'speedup': boolean_seconds / packed_seconds if packed_seconds > 0 else float('inf'),
+        'counts_match': count_boolean() == count_packed() == supports,
+    }
+
+
+def _timed_peak(func):
+    """Run func once, returning (result, seconds, peak traced bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+
+def benchmark_streaming_clustering(n_rows=500_000, chunk_size=50_000, seed=42):
+    """Compare full-batch KMeans against streaming MiniBatchKMeans on a generated CSV
+
+    Both fits are scored by inertia in the scaler space of the full-batch fit,
+    so the two numbers are directly comparable. Peak memory is traced
+    allocations during each fit, including reading the file.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'current_cgpa': np.clip(rng.normal(2.8, 0.6, n_rows), 0, 4).round(2),
+        'attendance': np.clip(rng.normal(78, 12, n_rows), 0, 100).round(1),
+    })
+    fd, file_path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        df.to_csv(file_path, index=False)
+
+        full = StudentPerformanceAnalyzer()
+
+        def fit_full():
+            data = full.load_and_preprocess_data(file_path)
+            return full.perform_clustering(data)
+
+        streaming = StudentPerformanceAnalyzer()
+        _, full_seconds, full_peak = _timed_peak(fit_full)
+        _, streaming_seconds, streaming_peak = _timed_peak(
+            lambda: streaming.perform_streaming_clustering(file_path, chunk_size=chunk_size, compute_inertia=False)
+        )
+
+        X = df[full.cluster_features].to_numpy(dtype=np.float32)
+        X_scaled = full.scaler.transform(X)
+        # Streaming centroids mapped into the full-batch scaler space
+        centers = full.scaler.transform(streaming.scaler.inverse_transform(streaming.kmeans_model.cluster_centers_))
+        streaming_labels = streaming.assign_clusters(df)
+        streaming_inertia = float(((X_scaled - centers[streaming_labels]) ** 2).sum())
+    finally:
+        os.remove(file_path)
+
+    return {
+        'rows': n_rows,
+        'full_seconds': full_seconds,
+        'streaming_seconds': streaming_seconds,
+        'full_peak_bytes': full_peak,
+        'streaming_peak_bytes': streaming_peak,
+        'full_inertia': float(full.kmeans_model.inertia_),
+        'streaming_inertia': streaming_inertia,
+    }
+
+
+def benchmark_tree_inference(n_train=20_000, n_single=2_000, batch_size=100_000, repeat=3, seed=42):
+    """Compare sklearn predict_proba against CompiledTree for one-row and batch scoring"""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(17, 30, n_train),
+        rng.integers(1, 9, n_train),
+        rng.uniform(40, 100, n_train).round(1),
+        rng.integers(0, 200, n_train),
+    ]).astype(np.float64)
+    y = rng.choice(['Distinction', 'First Class', 'Second Class', 'Pass'], n_train)
+    classifier = DecisionTreeClassifier(random_state=42, max_depth=10).fit(X, y)
+    tree = CompiledTree(classifier)
+
+    rows = X[rng.integers(0, n_train, n_single)]
+    batch = X[rng.integers(0, n_train, batch_size)]
+
+    def sklearn_single():
+        for row in rows:
+            probabilities = classifier.predict_proba(row.reshape(1, -1))[0]
+            probabilities.argmax()
+
+    def compiled_single():
+        for row in rows:
+            tree.predict_one(row)
+
+    sklearn_single_seconds = _best_time(sklearn_single, repeat)
+    compiled_single_seconds = _best_time(compiled_single, repeat)
+    sklearn_batch_seconds = _best_time(lambda: classifier.predict_proba(batch), repeat)
+    compiled_batch_seconds = _best_time(lambda: tree.predict_proba(batch), repeat)
+    flat_batch_seconds = _best_time(lambda: tree.proba[tree.apply_flat(batch)], repeat)
+    small_batch = batch[:100]
+    sklearn_small_seconds = _best_time(lambda: classifier.predict_proba(small_batch), repeat * 10)
+    compiled_small_seconds = _best_time(lambda: tree.predict_proba(small_batch), repeat * 10)
+
+    return {
+        'rows': batch_size,
+        'sklearn_single_us': sklearn_single_seconds / n_single * 1e6,
+        'compiled_single_us': compiled_single_seconds / n_single * 1e6,
+        'sklearn_batch_seconds': sklearn_batch_seconds,
+        'compiled_batch_seconds': compiled_batch_seconds,
+        'flat_batch_seconds': flat_batch_seconds,
+        'sklearn_100_rows_us': sklearn_small_seconds * 1e6,
+        'compiled_100_rows_us': compiled_small_seconds * 1e6,
+        'outputs_match': bool(
+            np.array_equal(tree.predict_proba(batch), classifier.predict_proba(batch))
+            and np.array_equal(tree.apply_flat(batch), classifier.apply(batch))
+            and all(tree.predict_one(row)[1] == classifier.predict_proba(row.reshape(1, -1)).max() for row in rows)
+        ),
+    }
+
+
+def benchmark_dtype_optimization(n_rows=500_000, seed=42):
+    """
+    Memory of a cleaned frame with default and compact dtypes, and the peak
+    allocations of feature building and rule mining on each; a compact frame
+    that got upcast on the way would show a peak as high as the default one
+    """
+    analyzer = StudentPerformanceAnalyzer()
+    default = generate_students(n_rows, seed=seed, missing_rate=0.0)
+    default['Performance_Category'] = analyzer.categorize_performance_vectorized(default['current_cgpa'])
+    compact = optimize_dtypes(default)
+
+    results = {}
+    for name, frame in (('default', default), ('compact', compact)):
+        results[f'{name}_frame_bytes'] = int(frame.memory_usage(deep=True).sum())
+        matrix, seconds, peak = _timed_peak(lambda: StudentPerformanceAnalyzer().build_feature_matrix(frame)[0])
+        results[f'{name}_features_seconds'] = seconds
+        results[f'{name}_features_peak_bytes'] = peak
+        rules, seconds, peak = _timed_peak(lambda: mine_association_rules(frame))
+        results[f'{name}_rules_seconds'] = seconds
+        results[f'{name}_rules_peak_bytes'] = peak
+        results[f'{name}_outputs'] = (matrix, rules)
+
+    default_matrix, default_rules = results.pop('default_outputs')
+    compact_matrix, compact_rules = results.pop('compact_outputs')
+    return {
+        'rows': n_rows,
+        'matrix_bytes': compact_matrix.nbytes,
+        **results,
+        'outputs_match': bool(np.array_equal(default_matrix, compact_matrix)) and default_rules == compact_rules,
+    }
+
+
+if __name__ == "__main__":
+    result = benchmark_categorization()
+    print(f"Performance categorization over {result['rows']:,} rows")
+    print(f"  apply:      {result['apply_seconds']:.3f}s")
+    print(f"  vectorized: {result['vectorized_seconds']:.3f}s")
+    print(f"  speedup:    {result['speedup']:.1f}x")
+    print(f"  labels match: {result['labels_match']}")
+
+    result = benchmark_support_counting()
+    print(f"Itemset support counting over {result['rows']:,} rows ({result['itemsets']} itemsets)")
+    print(f"  boolean: {result['boolean_seconds']:.3f}s, {result['boolean_bytes'] / 1e6:.1f} MB")
+    print(f"  packed:  {result['packed_seconds']:.3f}s, {result['packed_bytes'] / 1e6:.1f} MB")
+    print(f"  speedup: {result['speedup']:.1f}x")
+    print(f"  counts match: {result['counts_match']}")
+
+    result = benchmark_streaming_clustering()
+    print(f"K-means clustering over {result['rows']:,} rows")
+    print(f"  full batch: {result['full_seconds']:.2f}s, peak {result['full_peak_bytes'] / 1e6:.1f} MB, inertia {result['full_inertia']:.1f}")
+    print(f"  streaming:  {result['streaming_seconds']:.2f}s, peak {result['streaming_peak_bytes'] / 1e6:.1f} MB, inertia {result['streaming_inertia']:.1f}")
+
+    result = benchmark_tree_inference()
+    print("Decision tree inference")
+    print(f"  single row: sklearn {result['sklearn_single_us']:.1f}us, compiled {result['compiled_single_us']:.1f}us")
+    print(f"  100 rows: sklearn {result['sklearn_100_rows_us']:.1f}us, compiled {result['compiled_100_rows_us']:.1f}us")
+    print(
+        f"  {result['rows']:,} rows: sklearn {result['sklearn_batch_seconds'] * 1000:.1f}ms, "
+        f"compiled {result['compiled_batch_seconds'] * 1000:.1f}ms, flat arrays {result['flat_batch_seconds'] * 1000:.1f}ms"
+    )
+    print(f"  outputs match: {result['outputs_match']}")
+
+    result = benchmark_dtype_optimization()
+    print(f"Frame dtypes over {result['rows']:,} rows")
+    for name in ('default', 'compact'):
+        print(
+            f"  {name + ':':<8} frame {result[f'{name}_frame_bytes'] / 1e6:.1f} MB, "
+            f"features {result[f'{name}_features_seconds']:.2f}s peak {result[f'{name}_features_peak_bytes'] / 1e6:.1f} MB, "
+            f"rules {result[f'{name}_rules_seconds']:.2f}s peak {result[f'{name}_rules_peak_bytes'] / 1e6:.1f} MB"
+        )
+    print(f"  feature matrix itself: {result['matrix_bytes'] / 1e6:.1f} MB")
+    print(f"  outputs match: {result['outputs_match']}")
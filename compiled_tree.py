@@ -0,0 +1,136 @@
+"""
+Array-based inference for a fitted DecisionTreeClassifier
+sklearn's predict_proba validates and converts its input on every call, which
+dominates the cost of scoring a single student. CompiledTree copies the fitted
+tree into flat arrays once and walks them directly.
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+LEAF = -1
+
+
+class CompiledTree:
+    """
+    Flat-array copy of a fitted DecisionTreeClassifier
+    Node i splits on feature[i] at threshold[i] and continues to left[i] or
+    right[i]; leaves have left[i] == -1 and carry class probabilities in
+    proba[i]. Gives the same labels and probabilities as the classifier.
+    """
+
+    def __init__(self, classifier):
+        tree = classifier.tree_
+        self._tree = tree
+        self.classes = classifier.classes_
+        self.n_features = classifier.n_features_in_
+
+        self.feature = tree.feature.astype(np.intp)
+        self.threshold = tree.threshold.astype(np.float64)
+        self.left = tree.children_left.astype(np.intp)
+        self.right = tree.children_right.astype(np.intp)
+        missing_left = getattr(tree, 'missing_go_to_left', None)
+        self.missing_left = (
+            missing_left.astype(bool) if missing_left is not None else np.zeros(tree.node_count, dtype=bool)
+        )
+
+        # Older sklearn stores class counts and normalizes them in predict_proba;
+        # newer versions store the fractions and return them unchanged
+        values = tree.value[:, 0, :len(self.classes)].astype(np.float64)
+        normalizer = values.sum(axis=1)[:, np.newaxis]
+        if np.allclose(normalizer, 1.0):
+            self.proba = values
+        else:
+            normalizer[normalizer == 0.0] = 1.0
+            self.proba = values / normalizer
+        self.best = self.proba.argmax(axis=1)
+        self.best_proba = self.proba[np.arange(len(self.best)), self.best]
+
+        # Batch traversal runs max_depth steps over every row; leaves point to
+        # themselves so rows that already reached one stay there
+        leaves = self.left == LEAF
+        node_ids = np.arange(tree.node_count)
+        self.max_depth = tree.max_depth
+        self._step_feature = np.where(leaves, 0, self.feature)
+        self._step_threshold = np.where(leaves, np.inf, self.threshold)
+        self._step_left = np.where(leaves, node_ids, self.left)
+        self._step_right = np.where(leaves, node_ids, self.right)
+
+        # Sorted split points of each feature, for quantize
+        internal = ~leaves
+        self._split_points = [
+            np.unique(self.threshold[internal & (self.feature == j)]).tolist() for j in range(self.n_features)
+        ]
+
+        # Python lists make the per-node lookups of the single-row walk cheap
+        self._nodes = list(zip(
+            self.feature.tolist(), self.threshold.tolist(), self.left.tolist(),
+            self.right.tolist(), self.missing_left.tolist(),
+        ))
+        self._labels = [self.classes[i] for i in self.best.tolist()]
+        self._confidences = self.best_proba.tolist()
+
+    def leaf(self, row):
+        """Leaf index reached by one row of features"""
+        # sklearn compares float32 features against float64 thresholds
+        row = np.asarray(row, dtype=np.float32).tolist()
+        node = 0
+        feature, threshold, left, right, missing_left = self._nodes[0]
+        while left != LEAF:
+            value = row[feature]
+            if value <= threshold or (value != value and missing_left):
+                node = left
+            else:
+                node = right
+            feature, threshold, left, right, missing_left = self._nodes[node]
+        return node
+
+    def quantize(self, row):
+        """Interval of each feature between the tree's split points
+
+        Rows with equal keys take the same path and reach the same leaf, so
+        the key can stand in for the row when caching predictions. Returns
+        None for rows with missing values.
+        """
+        row = np.asarray(row, dtype=np.float32).tolist()
+        if any(value != value for value in row):
+            return None
+        return tuple(bisect_left(points, value) for points, value in zip(self._split_points, row))
+
+    def predict_one(self, row):
+        """(label, confidence) for one row, as argmax of predict_proba"""
+        node = self.leaf(row)
+        return self._labels[node], self._confidences[node]
+
+    def predict_proba_one(self, row):
+        return self.proba[self.leaf(row)]
+
+    def apply(self, X):
+        """Leaf index for every row of a 2-D array
+
+        Hands the whole array to the fitted tree's compiled traversal, which
+        skips the validation and conversion done by predict_proba.
+        """
+        return self._tree.apply(np.ascontiguousarray(X, dtype=np.float32)).astype(np.intp)
+
+    def apply_flat(self, X):
+        """Leaf index for every row using only the flat arrays, advancing all rows one level per step"""
+        X = np.asarray(X, dtype=np.float32)
+        has_missing = bool(np.isnan(X).any())
+        rows = np.arange(len(X))
+        nodes = np.zeros(len(X), dtype=np.intp)
+        for _ in range(self.max_depth):
+            values = X[rows, self._step_feature[nodes]]
+            go_left = values <= self._step_threshold[nodes]
+            if has_missing:
+                go_left |= np.isnan(values) & self.missing_left[nodes]
+            nodes = np.where(go_left, self._step_left[nodes], self._step_right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        return self.proba[self.apply(X)]
+
+    def predict(self, X):
+        """(labels, confidences) arrays for a batch"""
+        leaves = self.apply(X)
+        return self.classes[self.best[leaves]], self.best_proba[leaves]
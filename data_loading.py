@@ -0,0 +1,306 @@
+import numpy as np
+import pandas as pd
+
+# Explicit dtypes for the columns we know about. Numeric columns are read as
+# float64 so a missing value in one chunk never changes a column's dtype
+# between chunks; text columns stay as plain objects.
+STUDENT_DTYPES = {
+    'roll_no': 'object',
+    'name': 'object',
+    'gender': 'object',
+    'age': 'float64',
+    'admission_year': 'float64',
+    'current_semester': 'float64',
+    'current_cgpa': 'float64',
+    'previous_sgpa': 'float64',
+    'credits_completed': 'float64',
+    'attendance': 'float64',
+    'scholarship': 'object',
+    'probation': 'object',
+    'suspension': 'object',
+    'study_hours': 'float64',
+    'study_sessions': 'float64',
+    'learning_mode': 'object',
+    'social_media_hours': 'float64',
+    'skill_development_hours': 'float64',
+    'skills': 'object',
+    'interest_area': 'object',
+    'co_curricular': 'object',
+    'family_income': 'float64',
+}
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Identifiers are never imputed: a missing roll number must stay missing
+IDENTIFIER_COLUMNS = ('roll_no', 'name')
+
+# Spellings of "yes" found in flag columns such as scholarship or co_curricular
+TRUE_VALUES = {'yes', 'y', 'true', 't', '1', '1.0'}
+
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def factorize_labels(series):
+    """
+    (codes, labels) of a column read as text, so series.astype(str) == labels[codes]
+    Categoricals are decoded from their categories, without building a string
+    per row; missing values get the label 'nan', as astype(str) gives them.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        labels = series.cat.categories.astype(str).to_numpy(dtype=object)
+        codes = series.cat.codes.to_numpy()
+        if (codes < 0).any():
+            labels = np.append(labels, 'nan')
+            codes = np.where(codes < 0, len(labels) - 1, codes)
+        return codes, labels
+    codes, labels = pd.factorize(series.astype(str))
+    return codes, np.asarray(labels, dtype=object)
+
+
+def parse_flags(series):
+    """Convert a Yes/No, True/False or 1/0 column to booleans"""
+    codes, labels = factorize_labels(series)
+    flags = pd.Index(labels).str.strip().str.lower().isin(TRUE_VALUES)
+    return pd.Series(flags[codes], index=series.index)
+
+
+def _is_text(series):
+    # object on pandas < 3, the dedicated string dtype after
+    return not isinstance(series.dtype, pd.CategoricalDtype) and (
+        pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+    )
+
+
+def _downcast_integers(series):
+    return pd.to_numeric(series, downcast='unsigned' if series.min() >= 0 else 'integer')
+
+
+def optimize_dtypes(df, exclude=IDENTIFIER_COLUMNS):
+    """
+    Copy of df with compact dtypes
+    Whole numbers without missing values get the smallest integer type that
+    holds them (uint8 for attendance or semester), other numbers float32, and
+    text columns with few distinct values become categoricals.
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if column in exclude or pd.api.types.is_bool_dtype(series) or len(series) == 0:
+            pass
+        elif pd.api.types.is_integer_dtype(series):
+            series = _downcast_integers(series)
+        elif pd.api.types.is_float_dtype(series):
+            values = series.to_numpy()
+            if not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+                series = _downcast_integers(series.astype(np.int64))
+            else:
+                series = series.astype(np.float32)
+        elif _is_text(series) and series.nunique(dropna=False) <= len(series) * CATEGORY_MAX_UNIQUE_RATIO:
+            series = series.astype('category')
+        columns[column] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def dtype_report(before, after):
+    """Dtype and memory (deep, in bytes) of every column before and after optimize_dtypes"""
+    before_bytes = before.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False)
+    return {
+        'before_bytes': int(before_bytes.sum()),
+        'after_bytes': int(after_bytes.sum()),
+        'columns': {
+            column: {
+                'before_dtype': str(before[column].dtype),
+                'after_dtype': str(after[column].dtype),
+                'before_bytes': int(before_bytes[column]),
+                'after_bytes': int(after_bytes[column]),
+            }
+            for column in after.columns
+        },
+    }
+
+
+class RunningColumnStats:
+    """
+    Incrementally maintained mode/median statistics for imputation
+    Numeric columns are filled with their median, everything else with its mode.
+    """
+
+    def __init__(self, max_distinct=10_000, sample_size=100_000, seed=42):
+        self.max_distinct = max_distinct
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.counts = {}
+        self.numeric = {}
+        self.samples = {}
+        self.seen = {}
+        self.untracked = set()
+
+    def update(self, chunk):
+        """Fold one chunk into the running statistics"""
+        for column in chunk.columns:
+            if column in self.untracked:
+                continue
+
+            values = chunk[column].dropna()
+            is_numeric = pd.api.types.is_numeric_dtype(chunk[column])
+            self.numeric[column] = self.numeric.get(column, True) and is_numeric
+
+            if column in self.samples:
+                self._update_sample(column, values.to_numpy(dtype=np.float64))
+                continue
+
+            chunk_counts = values.value_counts()
+            if column in self.counts:
+                chunk_counts = self.counts[column].add(chunk_counts, fill_value=0)
+            self.counts[column] = chunk_counts
+
+            if len(chunk_counts) > self.max_distinct:
+                # Too many distinct values to count exactly in bounded memory
+                del self.counts[column]
+                if self.numeric[column]:
+                    self.seen[column] = 0
+                    self.samples[column] = np.empty(0)
+                    self._update_sample(column, chunk_counts.index.repeat(chunk_counts.astype(np.int64)).to_numpy(dtype=np.float64))
+                else:
+                    # High-cardinality text (names, roll numbers) has no useful mode
+                    self.untracked.add(column)
+
+    def _update_sample(self, column, values):
+        """Reservoir-sample numeric values once exact counts are too large"""
+        sample = self.samples[column]
+        seen = self.seen[column]
+
+        room = self.sample_size - len(sample)
+        if room > 0:
+            sample = np.concatenate([sample, values[:room]])
+            seen += min(room, len(values))
+            values = values[room:]
+
+        if len(values):
+            positions = seen + np.arange(1, len(values) + 1)
+            slots = (self.rng.random(len(values)) * positions).astype(np.int64)
+            keep = slots < self.sample_size
+            sample[slots[keep]] = values[keep]
+            seen += len(values)
+
+        self.samples[column] = sample
+        self.seen[column] = seen
+
+    def fill_values(self):
+        """Return the imputation value for every tracked column"""
+        fill = {}
+        for column, counts in self.counts.items():
+            if counts.empty:
+                continue
+            if self.numeric[column]:
+                counts = counts.sort_index()
+                cumulative = counts.cumsum().to_numpy()
+                total = cumulative[-1]
+                # Average the two middle values, as Series.median does
+                lower = counts.index[np.searchsorted(cumulative, (total + 1) // 2)]
+                upper = counts.index[np.searchsorted(cumulative, total // 2 + 1)]
+                fill[column] = (lower + upper) / 2
+            else:
+                fill[column] = counts.idxmax()
+
+        for column, sample in self.samples.items():
+            if len(sample):
+                fill[column] = float(np.median(sample))
+
+        return fill
+
+
+class StreamingDatasetLoader:
+    """
+    Chunked reader for CSV/Excel student datasets
+    Makes two passes over the file: the first builds imputation statistics,
+    the second yields cleaned chunks, so peak memory is bounded by the chunk
+    size rather than the file size.
+    """
+
+    def __init__(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE, dtypes=None, analyzer=None):
+        self.file_path = str(file_path)
+        self.chunk_size = chunk_size
+        self.dtypes = STUDENT_DTYPES if dtypes is None else dtypes
+        self.analyzer = analyzer
+        self.fill_values = None
+        self.total_rows = None
+
+    def iter_raw_chunks(self):
+        """Yield the file as DataFrames of at most chunk_size rows"""
+        if self.file_path.endswith('.csv'):
+            yield from self._iter_csv_chunks()
+        else:
+            yield from self._iter_excel_chunks()
+
+    def _iter_csv_chunks(self):
+        header = pd.read_csv(self.file_path, nrows=0).columns
+        dtypes = {col: dtype for col, dtype in self.dtypes.items() if col in header}
+        for chunk in pd.read_csv(self.file_path, chunksize=self.chunk_size, dtype=dtypes):
+            yield chunk
+
+    def _iter_excel_chunks(self):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+
+            buffer = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= self.chunk_size:
+                    yield self._frame_from_rows(buffer, header)
+                    buffer = []
+            if buffer:
+                yield self._frame_from_rows(buffer, header)
+        finally:
+            workbook.close()
+
+    def _frame_from_rows(self, rows, header):
+        chunk = pd.DataFrame.from_records(rows, columns=header)
+        for column, dtype in self.dtypes.items():
+            if column not in chunk.columns:
+                continue
+            if dtype == 'object':
+                chunk[column] = chunk[column].astype(object)
+            else:
+                chunk[column] = pd.to_numeric(chunk[column], errors='coerce').astype(dtype)
+        return chunk
+
+    def compute_fill_values(self):
+        """First pass: build running mode/median statistics over every chunk"""
+        stats = RunningColumnStats()
+        total_rows = 0
+        for chunk in self.iter_raw_chunks():
+            stats.update(chunk.drop(columns=[c for c in IDENTIFIER_COLUMNS if c in chunk.columns]))
+            total_rows += len(chunk)
+        self.fill_values = stats.fill_values()
+        self.total_rows = total_rows
+        return self.fill_values
+
+    def iter_chunks(self):
+        """Second pass: yield imputed and categorized chunks"""
+        if self.fill_values is None:
+            self.compute_fill_values()
+
+        for chunk in self.iter_raw_chunks():
+            chunk = chunk.fillna(self.fill_values)
+            if self.analyzer is not None and 'current_cgpa' in chunk.columns:
+                chunk['Performance_Category'] = self.analyzer.categorize_performance_vectorized(chunk['current_cgpa'])
+            yield chunk
+
+    def process(self, *consumers):
+        """Hand every cleaned chunk to each consumer callable, returning the row count"""
+        total_rows = 0
+        for chunk in self.iter_chunks():
+            for consumer in consumers:
+                consumer(chunk)
+            total_rows += len(chunk)
+        return total_rows
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Bump when the cleaning/categorization logic changes so stale entries are ignored
+CACHE_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'DATASET_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'student_analytics_cache'),
+)
+
+
+def file_content_hash(file_path, block_size=1 << 20):
+    """SHA-256 of a file's bytes, read in blocks so large uploads are not loaded at once"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """
+    On-disk cache of cleaned student frames keyed by upload content hash
+    Frames are stored as uncompressed Feather (Arrow IPC) files, which are
+    memory-mapped on load instead of re-parsing the original CSV/Excel file.
+    Feature matrices are stored as .npy files with a JSON sidecar, and
+    pipeline stage outputs as pickles.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = str(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key_for(self, file_path, variant=''):
+        """Cache key for a file; `variant` separates outputs of different settings"""
+        key = f"{file_content_hash(file_path)}-v{CACHE_FORMAT_VERSION}"
+        if variant:
+            key += '-' + hashlib.sha256(variant.encode()).hexdigest()[:12]
+        return key
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.feather")
+
+    def load(self, key):
+        """Return the cached frame for key, or None on a miss
+
+        Numeric columns without missing values are read-only views of the
+        memory-mapped file; the rest are converted onto the heap.
+        """
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+
+        from pyarrow import feather
+
+        try:
+            table = feather.read_table(path, memory_map=True)
+        except Exception as e:
+            print(f"Error reading cached dataset {path}: {e}")
+            return None
+        # One block per column: consolidating same-typed columns would copy them
+        return table.to_pandas(split_blocks=True)
+
+    def store(self, key, df):
+        """Write df under key; the rename makes the entry appear atomically"""
+        from pyarrow import feather
+
+        path = self.path_for(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def _write_atomically(self, path, write):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load_array(self, key):
+        """Return (read-only memory-mapped array, metadata dict) for key, or None on a miss"""
+        array_path = os.path.join(self.cache_dir, f"{key}.npy")
+        meta_path = os.path.join(self.cache_dir, f"{key}.json")
+        if not (os.path.exists(array_path) and os.path.exists(meta_path)):
+            return None
+
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            array = np.load(array_path, mmap_mode='r')
+        except Exception as e:
+            print(f"Error reading cached array {array_path}: {e}")
+            return None
+        return array, meta
+
+    def store_array(self, key, array, meta=None):
+        """Write a numpy array and its JSON metadata under key"""
+        def write_array(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+
+        def write_meta(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(meta or {}, f)
+
+        # The array goes first: an entry only counts once its metadata exists
+        self._write_atomically(os.path.join(self.cache_dir, f"{key}.npy"), write_array)
+        self._write_atomically(os.path.join(self.cache_dir, f"{key}.json"), write_meta)
+
+    def load_object(self, key):
+        """Return the pickled object stored under key, or None on a miss"""
+        path = os.path.join(self.cache_dir, f"{key}.pkl")
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Error reading cached object {path}: {e}")
+            return None
+
+    def store_object(self, key, value):
+        """Pickle value under key"""
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._write_atomically(os.path.join(self.cache_dir, f"{key}.pkl"), write)
+
+    def clear(self):
+        """Remove every cached dataset, feature matrix and pipeline output"""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(('.feather', '.npy', '.json', '.pkl')):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,58 @@
+"""
+Distribution drift between a model's training data and newly arrived rows
+Each feature is summarised by the share of training rows in quantile bins;
+new rows are binned the same way and compared with the Population Stability
+Index, sum((actual - expected) * ln(actual / expected)).
+"""
+import numpy as np
+
+DEFAULT_BINS = 10
+# Keeps empty bins from making the index infinite
+PSI_EPSILON = 1e-4
+# Usual reading of the index: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 major shift
+DEFAULT_PSI_THRESHOLD = 0.2
+
+
+def _bin_fractions(column, edges):
+    column = column[~np.isnan(column)]
+    if len(column) == 0:
+        return np.zeros(len(edges) + 1)
+    counts = np.bincount(np.searchsorted(edges, column, side='right'), minlength=len(edges) + 1)
+    return counts / len(column)
+
+
+def feature_profile(matrix, features, bins=DEFAULT_BINS):
+    """
+    Quantile bin edges and training fractions of every column of matrix
+    Returns {feature: {'edges': [...], 'fractions': [...]}}; columns with few
+    distinct values (flags, categorical codes) get one bin per value.
+    """
+    profile = {}
+    quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+    for i, feature in enumerate(features):
+        column = np.asarray(matrix[:, i], dtype=np.float64)
+        values = column[~np.isnan(column)]
+        edges = np.unique(np.quantile(values, quantiles)) if len(values) else np.array([])
+        profile[feature] = {
+            'edges': edges.tolist(),
+            'fractions': _bin_fractions(column, edges).tolist(),
+        }
+    return profile
+
+
+def population_stability_index(expected, actual):
+    expected = np.clip(np.asarray(expected, dtype=np.float64), PSI_EPSILON, None)
+    actual = np.clip(np.asarray(actual, dtype=np.float64), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def feature_drift(profile, matrix, features):
+    """PSI of each profiled feature between the training profile and the rows of matrix"""
+    drift = {}
+    for i, feature in enumerate(features):
+        if feature not in profile:
+            continue
+        edges = np.asarray(profile[feature]['edges'])
+        actual = _bin_fractions(np.asarray(matrix[:, i], dtype=np.float64), edges)
+        drift[feature] = population_stability_index(profile[feature]['fractions'], actual)
+    return drift
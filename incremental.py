@@ -0,0 +1,117 @@
+import time
+
+from django.conf import settings
+
+from .drift import DEFAULT_PSI_THRESHOLD
+from .ml_algorithms import StudentPerformanceAnalyzer
+from .model_tuning import DEFAULT_K_VALUES
+from .models import ModelVersion
+from .model_registry import load_version, register_model
+from .predictor import Predictor
+from .prediction_writer import get_prediction_writer
+from .summaries import carry_forward_cluster_summaries
+from . import warehouse
+
+# ModelVersion.metadata key: highest AcademicRecord pk the version has seen
+WATERMARK_KEY = 'academic_record_watermark'
+
+
+def _score(version, analyzer, frame):
+    writer = get_prediction_writer()
+    writer.record(Predictor(version, analyzer).predict_batch(frame), version.pk)
+    writer.flush()
+
+
+def retrain_from_database(auto_k=False):
+    """Fit the classifier and clusters on every student's latest records and register them
+
+    With auto_k, the number of clusters is selected from DEFAULT_K_VALUES
+    (one KMeans fit per candidate) instead of using the default k.
+    """
+    start = time.perf_counter()
+    watermark = warehouse.latest_record_pk()
+    frame = warehouse.training_frame(upto_pk=watermark)
+    if frame.empty:
+        raise ValueError('There are no academic records to train on')
+
+    analyzer = StudentPerformanceAnalyzer()
+    analyzer.train_classification_model(frame)
+    analyzer.perform_clustering(frame, k_values=DEFAULT_K_VALUES if auto_k else None)
+    if analyzer.dt_classifier is None or analyzer.kmeans_model is None:
+        raise ValueError('Training failed')
+
+    version = register_model(
+        analyzer,
+        training_data_hash=f"academic_record:{watermark}",
+        metadata={WATERMARK_KEY: watermark, 'update': {'mode': 'full', 'rows': len(frame)}},
+    )
+    _score(version, analyzer, frame)
+    return {
+        'mode': 'full',
+        'rows': len(frame),
+        'model_version': version.pk,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def update_models(drift_threshold=None, force_retrain=False):
+    """
+    Bring the active model up to date with academic records added since it was trained
+    Only students with records past the active version's watermark are read:
+    their rows move the cluster centres online, replacing the rows already
+    absorbed for students seen before, and the tree is retrained on the full
+    history only when some input's PSI exceeds drift_threshold.
+    Without an active version that has a watermark, everything is retrained.
+    """
+    threshold = drift_threshold if drift_threshold is not None else getattr(
+        settings, 'ANALYTICS_DRIFT_THRESHOLD', DEFAULT_PSI_THRESHOLD,
+    )
+    active = ModelVersion.objects.filter(is_active=True).order_by('-pk').first()
+    previous_watermark = active.metadata.get(WATERMARK_KEY) if active is not None else None
+    if previous_watermark is None:
+        return retrain_from_database()
+
+    analyzer = load_version(active)
+    if analyzer.cluster_counts is None or analyzer.feature_profile is None:
+        return retrain_from_database()
+
+    start = time.perf_counter()
+    watermark = warehouse.latest_record_pk()
+    frame = warehouse.training_frame(after_pk=previous_watermark, upto_pk=watermark)
+    if frame.empty:
+        return {'mode': 'unchanged', 'rows': 0, 'model_version': active.pk, 'seconds': time.perf_counter() - start}
+
+    superseded = warehouse.superseded_frame(after_pk=previous_watermark, upto_pk=watermark)
+    analyzer.update_clustering_online(frame, previous=superseded)
+    drift = analyzer.classification_drift(frame)
+    max_drift = max(drift.values(), default=0.0)
+    retrained = force_retrain or max_drift > threshold
+    if retrained:
+        previous = analyzer.dt_classifier
+        analyzer.train_classification_model(warehouse.training_frame(upto_pk=watermark))
+        if analyzer.dt_classifier is previous:
+            raise ValueError('Retraining the classifier failed')
+
+    update = {
+        'mode': 'incremental',
+        'rows': len(frame),
+        'updated_students': len(superseded),
+        'previous_version': active.pk,
+        'drift': drift,
+        'max_drift': max_drift,
+        'drift_threshold': threshold,
+        'retrained_classifier': retrained,
+    }
+    version = register_model(
+        analyzer,
+        training_data_hash=f"academic_record:{watermark}",
+        metadata={
+            WATERMARK_KEY: watermark,
+            'update': update,
+            'cluster_selection': active.metadata.get('cluster_selection'),
+        },
+    )
+    # Scoring moves carried-forward students out of the clusters of their superseded records
+    carry_forward_cluster_summaries(active.pk, version.pk)
+    _score(version, analyzer, frame)
+    return {**update, 'model_version': version.pk, 'seconds': time.perf_counter() - start}
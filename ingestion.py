@@ -0,0 +1,177 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from .ml_algorithms import StudentPerformanceAnalyzer
+from .data_loading import StreamingDatasetLoader, parse_flags
+from .dataset_cache import file_content_hash
+from .models import Student, AcademicRecord, StudentBehavior, IngestedDataset
+from .summaries import record_academic_batch, increment_counter, STUDENTS_COUNTER
+
+DEFAULT_BATCH_SIZE = 2000
+
+# Dataset column -> model field default, for each model written per row
+STUDENT_COLUMNS = {
+    'name': '',
+    'gender': '',
+    'age': 0,
+    'admission_year': 0,
+    'current_semester': 0,
+}
+ACADEMIC_COLUMNS = {
+    'current_cgpa': 0.0,
+    'previous_sgpa': 0.0,
+    'credits_completed': 0,
+    'attendance': 0,
+    'scholarship': False,
+    'probation': False,
+    'suspension': False,
+}
+BEHAVIOR_COLUMNS = {
+    'study_hours': 0,
+    'study_sessions': 0,
+    'learning_mode': '',
+    'social_media_hours': 0,
+    'skill_development_hours': 0,
+    'skills': '',
+    'interest_area': '',
+    'co_curricular': False,
+}
+
+
+def _column_values(chunk, model, column, default):
+    """Convert one dataset column to a list of values for a model field"""
+    if column not in chunk.columns:
+        return [default] * len(chunk)
+
+    series = chunk[column]
+    if isinstance(default, bool):
+        values = parse_flags(series)
+    elif isinstance(default, int):
+        values = pd.to_numeric(series, errors='coerce').fillna(default).round().astype(np.int64)
+    elif isinstance(default, float):
+        values = pd.to_numeric(series, errors='coerce').fillna(default).astype(np.float64)
+    else:
+        values = series.fillna(default).astype(str).str.strip()
+        max_length = getattr(model._meta.get_field(column), 'max_length', None)
+        if max_length:
+            values = values.str.slice(0, max_length)
+    return values.tolist()
+
+
+def _model_rows(chunk, model, columns):
+    """Build one dict of field values per row, converting whole columns at once"""
+    values = {column: _column_values(chunk, model, column, default) for column, default in columns.items()}
+    return [dict(zip(values, row)) for row in zip(*values.values())]
+
+
+def _ingest_batch(batch, categories):
+    """Upsert students and append their academic/behavior records in one transaction"""
+    roll_nos = batch['roll_no'].tolist()
+    student_rows = _model_rows(batch, Student, STUDENT_COLUMNS)
+    academic_rows = _model_rows(batch, AcademicRecord, ACADEMIC_COLUMNS)
+    behavior_rows = _model_rows(batch, StudentBehavior, BEHAVIOR_COLUMNS)
+
+    with transaction.atomic():
+        existing = set(Student.objects.in_bulk(roll_nos, field_name='roll_no'))
+
+        # Later rows for the same roll_no win, as they would with save()
+        students = {roll_no: Student(roll_no=roll_no, **fields) for roll_no, fields in zip(roll_nos, student_rows)}
+        Student.objects.bulk_create(
+            students.values(),
+            batch_size=DEFAULT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['roll_no'],
+            update_fields=list(STUDENT_COLUMNS),
+        )
+        # Upserted rows do not get their primary keys back on every backend
+        ids = Student.objects.in_bulk(list(students), field_name='roll_no')
+
+        AcademicRecord.objects.bulk_create(
+            [
+                AcademicRecord(
+                    student=ids[roll_no],
+                    performance_category=category,
+                    semester=student_fields['current_semester'],
+                    **fields,
+                )
+                for roll_no, category, student_fields, fields in zip(roll_nos, categories, student_rows, academic_rows)
+            ],
+            batch_size=DEFAULT_BATCH_SIZE,
+        )
+        StudentBehavior.objects.bulk_create(
+            [StudentBehavior(student=ids[roll_no], **fields) for roll_no, fields in zip(roll_nos, behavior_rows)],
+            batch_size=DEFAULT_BATCH_SIZE,
+        )
+
+        created = len(students.keys() - existing)
+        record_academic_batch(pd.DataFrame({
+            'semester': [fields['current_semester'] for fields in student_rows],
+            'admission_year': [fields['admission_year'] for fields in student_rows],
+            'performance_category': categories,
+            'current_cgpa': [fields['current_cgpa'] for fields in academic_rows],
+            'attendance': [fields['attendance'] for fields in academic_rows],
+            'credits_completed': [fields['credits_completed'] for fields in academic_rows],
+        }))
+        increment_counter(STUDENTS_COUNTER, created)
+
+    return created, len(students) - created
+
+
+def ingest_dataset(file_path, batch_size=DEFAULT_BATCH_SIZE, analyzer=None, progress=None):
+    """
+    Parse an uploaded CSV/Excel file into Student, AcademicRecord and StudentBehavior
+    Rows are streamed in chunks and written with bulk queries, one transaction
+    per batch. Returns counts and throughput for reporting back to the user.
+    If given, progress(rows_done, total_rows) is called after every batch.
+    A file whose content was already ingested adds nothing, so re-uploading it
+    does not duplicate records; the result then has duplicate_of set.
+    """
+    analyzer = analyzer or StudentPerformanceAnalyzer()
+    start = time.perf_counter()
+    result = {'rows': 0, 'skipped': 0, 'students_created': 0, 'students_updated': 0}
+
+    content_hash = file_content_hash(file_path)
+    previous = IngestedDataset.objects.filter(content_hash=content_hash).first()
+    if previous is not None:
+        result.update(duplicate_of=previous.file_name, seconds=time.perf_counter() - start, rows_per_second=0.0)
+        return result
+
+    loader = StreamingDatasetLoader(file_path, chunk_size=batch_size, analyzer=analyzer)
+    loader.compute_fill_values()
+    rows_done = 0
+
+    for chunk in loader.iter_chunks():
+        rows_done += len(chunk)
+        if 'roll_no' not in chunk.columns:
+            raise ValueError("Dataset has no 'roll_no' column")
+
+        roll_no = chunk['roll_no'].astype(str).str.strip()
+        valid = chunk['roll_no'].notna() & (roll_no != '')
+        result['skipped'] += int((~valid).sum())
+
+        batch = chunk[valid].assign(roll_no=roll_no[valid].str.slice(0, Student._meta.get_field('roll_no').max_length))
+        if not batch.empty:
+            if 'Performance_Category' in batch.columns:
+                categories = batch['Performance_Category'].astype(str).tolist()
+            else:
+                categories = [analyzer.categorize_performance(None)] * len(batch)
+
+            created, updated = _ingest_batch(batch, categories)
+            result['rows'] += len(batch)
+            result['students_created'] += created
+            result['students_updated'] += updated
+
+        if progress:
+            progress(rows_done, loader.total_rows)
+
+    IngestedDataset.objects.get_or_create(
+        content_hash=content_hash,
+        defaults={'file_name': os.path.basename(file_path)[:255], 'rows': result['rows']},
+    )
+    result['seconds'] = time.perf_counter() - start
+    result['rows_per_second'] = result['rows'] / result['seconds'] if result['seconds'] > 0 else 0.0
+    return result
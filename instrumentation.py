@@ -0,0 +1,353 @@
+"""
+In-process metrics, stage tracing and sampling profiler
+Histograms and counters are kept in a process-wide registry and rendered in
+the Prometheus text exposition format. Nothing here depends on Django, so the
+analyzer can trace its stages whether it runs in a web process, a background
+job or a script.
+"""
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from functools import wraps
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+ANALYZER_STAGE_SECONDS = 'analyzer_stage_duration_seconds'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter with a fixed set of label names
+    Samples, HELP and TYPE are all exposed as name_total, as prometheus_client
+    does in the 0.0.4 text format.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.exposed_name = f"{name}_total"
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.exposed_name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.exposed_name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.label_names)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, key, ('le', _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered together for scraping"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labels, buckets)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.exposed_name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.exposed_name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry():
+    """Return the process-wide metrics registry"""
+    return _registry
+
+
+def _peak_rss_bytes():
+    """High-water mark of the process's resident set size, or None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _row_count(value):
+    shape = getattr(value, 'shape', None)
+    return int(shape[0]) if shape else None
+
+
+class StageTrace:
+    """
+    Report of the stages of one pipeline run
+    Each stage records wall and CPU time, the process's peak RSS, row counts
+    and whether it failed; with trace_memory, the tracemalloc delta and peak
+    as well (stages running concurrently share the tracemalloc peak). Records
+    are appended to jsonl_path as each stage finishes and every stage's wall
+    time also goes to analyzer_stage_duration_seconds.
+    """
+
+    def __init__(self, jsonl_path=None, trace_memory=False):
+        self.run_id = uuid.uuid4().hex
+        self.jsonl_path = jsonl_path
+        self.trace_memory = trace_memory
+        self.records = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._owns_tracemalloc = False
+        self._running = 0
+        self._histogram = _registry.histogram(
+            ANALYZER_STAGE_SECONDS, 'Time spent in StudentPerformanceAnalyzer stages', ('stage',),
+        )
+
+    @property
+    def _active(self):
+        # Stages running on this thread, innermost last; concurrent branches each have their own
+        if not hasattr(self._local, 'active'):
+            self._local.active = []
+        return self._local.active
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Trace the enclosed block; yields the record so rows_out can be filled in"""
+        record = {
+            'run_id': self.run_id,
+            'stage': name,
+            'parent': self._active[-1]['stage'] if self._active else None,
+            'started_at': time.time(),
+            'rows_in': rows_in,
+            'rows_out': None,
+            'status': 'ok',
+            'error': None,
+        }
+        tracing = self.trace_memory
+        with self._lock:
+            self._running += 1
+            if tracing and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracemalloc = True
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # Keep the enclosing stages' peaks before resetting it for this one
+            for outer in self._active:
+                outer['_traced_peak'] = max(outer.get('_traced_peak', 0), peak)
+            tracemalloc.reset_peak()
+            record['_traced_start'] = current
+        self._active.append(record)
+        rss_before = _peak_rss_bytes()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        except Exception as e:
+            self.fail(e)
+            raise
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall_start
+            record['cpu_seconds'] = time.process_time() - cpu_start
+            record['peak_rss_bytes'] = _peak_rss_bytes()
+            record['peak_rss_growth_bytes'] = (
+                record['peak_rss_bytes'] - rss_before if rss_before is not None else None
+            )
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                start = record.pop('_traced_start')
+                record['tracemalloc_delta_bytes'] = current - start
+                record['tracemalloc_peak_bytes'] = max(record.pop('_traced_peak', 0), peak) - start
+            self._active.pop()
+            self._finish(record)
+
+    def _finish(self, record):
+        self._histogram.observe(record['wall_seconds'], stage=record['stage'])
+        with self._lock:
+            self.records.append(record)
+            self._running -= 1
+            if self._owns_tracemalloc and not self._running:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+            if self.jsonl_path:
+                with open(self.jsonl_path, 'a') as f:
+                    f.write(json.dumps(record, default=str) + '\n')
+
+    def fail(self, error):
+        """Mark the innermost running stage as failed; for stages that handle their own errors"""
+        if self._active:
+            self._active[-1]['status'] = 'error'
+            self._active[-1]['error'] = f"{type(error).__name__}: {error}"
+
+    def to_dicts(self):
+        return [dict(record) for record in self.records]
+
+    def summary(self):
+        """One line per stage, in the order they finished"""
+        lines = []
+        for record in self.records:
+            rows = ' -> '.join('-' if n is None else str(n) for n in (record['rows_in'], record['rows_out']))
+            memory = record.get('tracemalloc_peak_bytes')
+            memory = f" {memory / 1e6:8.1f} MB" if memory is not None else ''
+            status = '' if record['status'] == 'ok' else f" FAILED ({record['error']})"
+            lines.append(
+                f"{record['stage']:<30} {record['wall_seconds']:8.3f}s wall "
+                f"{record['cpu_seconds']:8.3f}s cpu {rows:>20}{memory}{status}"
+            )
+        return '\n'.join(lines)
+
+
+def traced_stage(stage, rows_out=_row_count):
+    """
+    Trace a StudentPerformanceAnalyzer method as a stage of self.trace
+    rows_in is the length of the first frame or array argument; rows_out is
+    computed from the method's result.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            rows_in = next((n for n in map(_row_count, args) if n is not None), None)
+            with self.trace.stage(stage, rows_in=rows_in) as record:
+                result = func(self, *args, **kwargs)
+                if result is not None:
+                    record['rows_out'] = rows_out(result)
+                return result
+        return wrapper
+    return decorator
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for one thread
+    A background thread records the target thread's call stack every
+    interval seconds; folded() returns the samples in the collapsed-stack
+    format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.samples = _Tally()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _frame_name(self, frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def folded(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
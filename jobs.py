@@ -0,0 +1,259 @@
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+from .aggregates import invalidate_aggregates
+
+DEFAULT_WORKERS = 1
+DEFAULT_HEARTBEAT_SECONDS = 10
+# A running job whose heartbeat is older than this has lost its worker
+DEFAULT_STALE_SECONDS = 120
+
+_handlers = {}
+
+
+def register_job(kind):
+    """Register a function as the handler for jobs of the given kind
+
+    Handlers are called as handler(job, report_progress) and return a
+    JSON-serialisable result that is stored on the job.
+    """
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+class JobQueue:
+    """
+    In-process job queue backed by a thread pool
+    Job state lives in the Job table, so progress can be polled from any
+    worker process and no external broker is needed. Running jobs are stamped
+    with their worker and a heartbeat; once started, the queue fails jobs whose
+    heartbeat went stale (their process died) and picks up queued ones.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or getattr(settings, 'ANALYTICS_JOB_WORKERS', DEFAULT_WORKERS)
+        self.heartbeat_seconds = getattr(settings, 'ANALYTICS_JOB_HEARTBEAT_SECONDS', DEFAULT_HEARTBEAT_SECONDS)
+        self.stale_seconds = getattr(settings, 'ANALYTICS_JOB_STALE_SECONDS', DEFAULT_STALE_SECONDS)
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analytics-job')
+        self._submitted = set()
+        self._monitor = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the heartbeat thread, which also recovers jobs left by dead workers"""
+        with self._lock:
+            if self._monitor is not None:
+                return
+            self._monitor = threading.Thread(target=self._watch, name='analytics-job-heartbeat', daemon=True)
+            self._monitor.start()
+
+    def enqueue(self, kind, **payload):
+        """Create a job record and run it once the current transaction commits"""
+        if kind not in _handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+
+        # Jobs run here need heartbeats even where the queue was not started at startup
+        self.start()
+        job = Job.objects.create(kind=kind, payload=payload)
+        transaction.on_commit(lambda: self._submit(job.pk))
+        return job
+
+    def _submit(self, job_id):
+        with self._lock:
+            if job_id in self._submitted:
+                return
+            self._submitted.add(job_id)
+        self.executor.submit(self._run, job_id)
+
+    def _watch(self):
+        # Started from AppConfig.ready; the database may only be used once every app is loaded
+        apps.ready_event.wait()
+        while True:
+            try:
+                Job.objects.filter(status='running', worker=self.worker).update(heartbeat_at=timezone.now())
+                self.recover_interrupted_jobs()
+            except Exception as e:
+                print(f"Error checking jobs: {e}")
+            finally:
+                close_old_connections()
+            time.sleep(self.heartbeat_seconds)
+
+    def recover_interrupted_jobs(self):
+        """Fail running jobs whose worker stopped sending heartbeats and run queued ones"""
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=self.stale_seconds)
+        Job.objects.filter(status='running').filter(
+            Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+        ).update(status='failed', error='Interrupted: its worker stopped responding', finished_at=now)
+        for job_id in Job.objects.filter(status='queued').values_list('pk', flat=True):
+            self._submit(job_id)
+
+    def _run(self, job_id):
+        close_old_connections()
+        try:
+            # Claim the job atomically so a resubmitted job never runs twice
+            now = timezone.now()
+            claimed = Job.objects.filter(pk=job_id, status='queued').update(
+                status='running', started_at=now, worker=self.worker, heartbeat_at=now,
+            )
+            if not claimed:
+                return
+
+            job = Job.objects.get(pk=job_id)
+            # Final updates leave alone a job that was failed as stale meanwhile
+            running = Job.objects.filter(pk=job_id, status='running', worker=self.worker)
+
+            def report_progress(fraction, message=''):
+                running.update(
+                    progress=min(max(fraction, 0.0), 1.0), message=message[:255], heartbeat_at=timezone.now(),
+                )
+
+            try:
+                result = _handlers[job.kind](job, report_progress)
+            except Exception as e:
+                running.update(
+                    status='failed',
+                    message=str(e)[:255],
+                    error=traceback.format_exc(),
+                    finished_at=timezone.now(),
+                )
+                return
+
+            running.update(
+                status='succeeded', progress=1.0, message='Completed', result=result, finished_at=timezone.now()
+            )
+        finally:
+            with self._lock:
+                self._submitted.discard(job_id)
+            close_old_connections()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue, creating it on first use"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
+
+
+_pipeline_store = None
+_pipeline_store_lock = threading.Lock()
+
+
+def get_pipeline_store():
+    """Return the process-wide store of analysis pipeline outputs, creating it on first use"""
+    from .dataset_cache import DatasetCache
+    from .pipeline import ArtifactStore
+
+    global _pipeline_store
+    if _pipeline_store is None:
+        with _pipeline_store_lock:
+            if _pipeline_store is None:
+                cache_dir = getattr(settings, 'ANALYTICS_PIPELINE_CACHE_DIR', None)
+                _pipeline_store = ArtifactStore(DatasetCache(cache_dir) if cache_dir else None)
+    return _pipeline_store
+
+
+@register_job('ingest_dataset')
+def ingest_dataset_job(job, report_progress):
+    from .ingestion import ingest_dataset
+
+    def on_progress(rows_done, total_rows):
+        report_progress(rows_done / total_rows if total_rows else 0.0, f"Imported {rows_done:,} of {total_rows:,} rows")
+
+    result = ingest_dataset(job.payload['file_path'], progress=on_progress)
+    invalidate_aggregates()
+    return result
+
+
+@register_job('train_models')
+def train_models_job(job, report_progress):
+    from .ml_algorithms import StudentPerformanceAnalyzer
+    from .instrumentation import StageTrace
+    from .dataset_cache import file_content_hash
+    from .pipeline import run_analysis
+    from .model_tuning import DEFAULT_K_VALUES
+    from .model_registry import register_model
+    from .predictor import Predictor
+    from .prediction_writer import get_prediction_writer
+
+    trace = StageTrace(
+        jsonl_path=getattr(settings, 'ANALYTICS_TRACE_FILE', None),
+        trace_memory=getattr(settings, 'ANALYTICS_TRACE_MEMORY', False),
+    )
+
+    def on_stage(stage, done, total):
+        report_progress(0.1 + 0.7 * done / total, f"Finished {stage}")
+
+    report_progress(0.1, 'Running analysis pipeline')
+    analyzer, run = run_analysis(
+        job.payload['file_path'],
+        analyzer=StudentPerformanceAnalyzer(trace=trace),
+        targets=('clean', 'classify', 'cluster'),
+        progress=on_stage,
+        store=get_pipeline_store(),
+        tune=bool(job.payload.get('tune')),
+        n_clusters=job.payload.get('clusters'),
+        # Selecting k fits KMeans once per candidate, so uploads only do it on request
+        k_values=DEFAULT_K_VALUES if job.payload.get('auto_k') else None,
+    )
+    df = run['outputs']['clean']
+    accuracy = analyzer.accuracy
+
+    version = register_model(
+        analyzer,
+        training_data_hash=file_content_hash(job.payload['file_path']),
+        metadata={'tuning': analyzer.tuning_report} if analyzer.tuning_report else None,
+    )
+
+    # Score the uploaded cohort with the new model so cluster statistics are available
+    report_progress(0.9, 'Scoring students')
+    writer = get_prediction_writer()
+    writer.record(Predictor(version, analyzer).predict_batch(df), version.pk)
+    writer.flush()
+    invalidate_aggregates()
+
+    return {
+        'rows': len(df),
+        'accuracy': accuracy,
+        'model_version': version.pk,
+        'stages': trace.to_dicts(),
+        'pipeline': {'executed': run['executed'], 'cached': run['cached']},
+    }
+
+
+@register_job('update_models')
+def update_models_job(job, report_progress):
+    from .incremental import update_models
+
+    report_progress(0.1, 'Updating models with new academic records')
+    result = update_models(
+        drift_threshold=job.payload.get('drift_threshold'),
+        force_retrain=bool(job.payload.get('force_retrain')),
+    )
+    invalidate_aggregates()
+    return result
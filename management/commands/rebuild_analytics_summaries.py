@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from analytics.aggregates import invalidate_aggregates
+from analytics.models import PerformanceSummary, ClusterSummary
+from analytics.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the analytics summary tables from AcademicRecord and Prediction'
+
+    def handle(self, *args, **options):
+        rebuild_summaries()
+        invalidate_aggregates()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {PerformanceSummary.objects.count()} performance and "
+            f"{ClusterSummary.objects.count()} cluster summary rows"
+        ))
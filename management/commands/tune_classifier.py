@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.dataset_cache import file_content_hash
+from analytics.ml_algorithms import StudentPerformanceAnalyzer
+from analytics.model_registry import register_model
+
+
+class Command(BaseCommand):
+    help = 'Grid-search Decision Tree parameters on a dataset and register the best model'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file_path', help='CSV or Excel dataset to tune on')
+        parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds')
+        parser.add_argument('--jobs', type=int, default=None, help='Worker processes (default: one per CPU)')
+        parser.add_argument('--compare-serial', action='store_true', help='Repeat the search in-process and report the speedup')
+        parser.add_argument('--no-activate', action='store_true', help='Register the model without making it active')
+
+    def handle(self, *args, **options):
+        analyzer = StudentPerformanceAnalyzer()
+        df = analyzer.load_and_preprocess_data(options['file_path'])
+        if df is None:
+            raise CommandError('Dataset could not be loaded')
+
+        analyzer.tune_classification_model(
+            df, n_folds=options['folds'], n_jobs=options['jobs'], compare_serial=options['compare_serial'],
+        )
+        report = analyzer.tuning_report
+        if report is None:
+            raise CommandError('Tuning failed')
+        analyzer.perform_clustering(df)
+
+        version = register_model(
+            analyzer,
+            training_data_hash=file_content_hash(options['file_path']),
+            metadata={'tuning': report},
+            activate=not options['no_activate'],
+        )
+
+        self.stdout.write(
+            f"{report['candidates']} candidates, {report['folds']}-fold CV on {report['n_jobs']} processes: "
+            f"{report['seconds']:.1f}s"
+        )
+        self.stdout.write(analyzer.trace.summary())
+        if 'serial_seconds' in report:
+            self.stdout.write(f"Serial: {report['serial_seconds']:.1f}s, speedup {report['speedup']:.2f}x")
+        self.stdout.write(self.style.SUCCESS(
+            f"Registered model version {version.pk}: {report['best_params']} on {report['best_features']}, "
+            f"CV accuracy {report['cv_accuracy']:.3f}, test accuracy {report['test_accuracy']:.3f}"
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.aggregates import invalidate_aggregates
+from analytics.incremental import retrain_from_database, update_models
+
+
+class Command(BaseCommand):
+    help = 'Update the active model with academic records added since it was trained (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drift-threshold', type=float, default=None, help='PSI above which the tree is retrained')
+        parser.add_argument('--force-retrain', action='store_true', help='Retrain the tree even without drift')
+        parser.add_argument('--full', action='store_true', help='Retrain everything on the full history')
+        parser.add_argument('--auto-k', action='store_true', help='With --full, select the number of clusters')
+
+    def handle(self, *args, **options):
+        try:
+            if options['full']:
+                result = retrain_from_database(auto_k=options['auto_k'])
+            else:
+                result = update_models(
+                    drift_threshold=options['drift_threshold'], force_retrain=options['force_retrain'],
+                )
+        except ValueError as e:
+            raise CommandError(str(e))
+        invalidate_aggregates()
+
+        if result['mode'] == 'unchanged':
+            self.stdout.write(f"No new academic records; model version {result['model_version']} is current")
+            return
+        if result['mode'] == 'incremental':
+            self.stdout.write(
+                f"{result['rows']} new students, max drift {result['max_drift']:.3f} "
+                f"(threshold {result['drift_threshold']}): "
+                f"{'classifier retrained' if result['retrained_classifier'] else 'classifier kept'}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Registered model version {result['model_version']} ({result['mode']}, {result['rows']} rows) "
+            f"in {result['seconds']:.1f}s"
+        ))
@@ -2,73 +2,277 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+import hashlib
 import pickle
 import warnings
+from .data_loading import (
+    StreamingDatasetLoader, DEFAULT_CHUNK_SIZE, dtype_report, factorize_labels, optimize_dtypes, parse_flags,
+)
+from .association_mining import mine_association_rules
+from .model_tuning import grid_search, select_k
+from .compiled_tree import CompiledTree
+from .drift import feature_drift, feature_profile
+from .instrumentation import StageTrace, traced_stage
 warnings.filterwarnings('ignore')
 
+# Minimum CGPA for each performance category, highest band first. Anything
+# below the last threshold (or not a number at all) falls into the default.
+PERFORMANCE_THRESHOLDS = (
+    (3.5, 'Distinction'),
+    (3.0, 'First Class'),
+    (2.5, 'Second Class'),
+)
+DEFAULT_PERFORMANCE_CATEGORY = 'Pass'
+
+# Model inputs. Behavior columns match the StudentBehavior fields; flags are
+# encoded as 0/1 and categoricals through the analyzer's label_encoders.
+BEHAVIOR_FEATURES = ['study_hours', 'social_media_hours', 'skill_development_hours']
+FLAG_FEATURES = ['co_curricular']
+CATEGORICAL_FEATURES = ['learning_mode']
+CLASSIFICATION_FEATURES = (
+    ['age', 'current_semester', 'attendance', 'credits_completed']
+    + BEHAVIOR_FEATURES + FLAG_FEATURES + CATEGORICAL_FEATURES
+)
+CLUSTER_FEATURES = ['current_cgpa', 'attendance']
+
+# Bump when encode_feature changes so cached feature matrices are rebuilt
+FEATURE_FORMAT_VERSION = 1
+
 class StudentPerformanceAnalyzer:
     """
     Complete ML pipeline for student performance analysis
     Implements Classification, Clustering, and Association Rule Mining
     """
 
-    def __init__(self):
+    def __init__(self, performance_thresholds=PERFORMANCE_THRESHOLDS, dataset_cache=None, trace=None):
         self.dt_classifier = None
         self.kmeans_model = None
         self.label_encoders = {}
         self.scaler = StandardScaler()
-
+        self.performance_thresholds = sorted(performance_thresholds, reverse=True)
+        self.dataset_cache = dataset_cache
+        self.dataset_key = None
+        self.classification_features = []
+        self.cluster_features = []
+        self.feature_medians = {}
+        self.accuracy = None
+        self.tuning_report = None
+        self.cluster_selection = None
+        self.cluster_counts = None
+        self.feature_profile = None
+        self.dtype_report = None
+        self.feature_matrices = {}
+        self._compiled_tree = None
+        self.trace = trace if trace is not None else StageTrace()
+
+    @traced_stage('load_and_preprocess_data')
     def load_and_preprocess_data(self, file_path):
-        """Load and preprocess the student dataset"""
+        """Load and preprocess the student dataset
+
+        With a dataset_cache configured, a file that was already processed is
+        read back from the cache instead of being parsed again.
+        """
         try:
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
+            if self.dataset_cache is not None:
+                self.dataset_key = self.dataset_cache.key_for(file_path, variant=repr(self.performance_thresholds))
+                df = self.dataset_cache.load(self.dataset_key)
+                if df is not None:
+                    return df
 
-            # Handle missing values
-            df = df.fillna(df.mode().iloc[0] if len(df.mode()) > 0 else 0)
+            df = self.clean_data(self.read_dataset(file_path))
 
-            # Create performance categories
-            if 'current_cgpa' in df.columns:
-                df['Performance_Category'] = df['current_cgpa'].apply(self.categorize_performance)
+            if self.dataset_cache is not None:
+                try:
+                    self.dataset_cache.store(self.dataset_key, df)
+                except Exception as e:
+                    # The cleaned frame is still good; only the next load misses the cache
+                    print(f"Error caching dataset: {e}")
 
             return df
         except Exception as e:
             print(f"Error loading data: {e}")
+            self.trace.fail(e)
             return None
 
+    @traced_stage('read_dataset')
+    def read_dataset(self, file_path):
+        """Read a CSV or Excel dataset as it is"""
+        if file_path.endswith('.csv'):
+            return pd.read_csv(file_path)
+        return pd.read_excel(file_path)
+
+    @traced_stage('clean_data')
+    def clean_data(self, df):
+        """Fill missing values with each column's mode, add Performance_Category and compact the dtypes
+
+        The memory saved by optimize_dtypes is kept in dtype_report.
+        """
+        df = df.fillna(df.mode().iloc[0] if len(df.mode()) > 0 else 0)
+
+        if 'current_cgpa' in df.columns:
+            df['Performance_Category'] = self.categorize_performance_vectorized(df['current_cgpa'])
+
+        compact = optimize_dtypes(df)
+        self.dtype_report = dtype_report(df, compact)
+        print(f"Frame memory: {self.dtype_report['before_bytes'] / 1e6:.1f} MB -> "
+              f"{self.dtype_report['after_bytes'] / 1e6:.1f} MB")
+        return compact
+
+    def iter_preprocessed_chunks(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Stream the dataset as cleaned, categorized chunks of bounded size
+
+        Use this instead of load_and_preprocess_data for files that do not fit
+        in memory; NaNs are filled from statistics over the whole file.
+        """
+        loader = StreamingDatasetLoader(file_path, chunk_size=chunk_size, analyzer=self)
+        return loader.iter_chunks()
+
     def categorize_performance(self, cgpa):
         """Convert CGPA to performance categories"""
         try:
             cgpa = float(cgpa)
-            if cgpa >= 3.5:
-                return 'Distinction'
-            elif cgpa >= 3.0:
-                return 'First Class'
-            elif cgpa >= 2.5:
-                return 'Second Class'
-            else:
-                return 'Pass'
+            for threshold, label in self.performance_thresholds:
+                if cgpa >= threshold:
+                    return label
+            return DEFAULT_PERFORMANCE_CATEGORY
         except:
-            return 'Pass'
-
+            return DEFAULT_PERFORMANCE_CATEGORY
+
+    def categorize_performance_vectorized(self, cgpa_values):
+        """Convert a whole column of CGPAs to an ordered Categorical in one pass
+
+        Gives the same labels as categorize_performance: values that are not
+        numbers (or NaN) become the default category.
+        """
+        values = pd.to_numeric(pd.Series(cgpa_values), errors='coerce').to_numpy(dtype=np.float64)
+
+        # Bin edges ascending, so code 0 is the default category
+        edges = np.array([threshold for threshold, _ in reversed(self.performance_thresholds)])
+        categories = [DEFAULT_PERFORMANCE_CATEGORY] + [label for _, label in reversed(self.performance_thresholds)]
+
+        codes = np.searchsorted(edges, values, side='right')
+        codes[np.isnan(values)] = 0
+
+        return pd.Categorical.from_codes(codes, categories=categories, ordered=True)
+
+    def encode_feature(self, feature, values, fit=False):
+        """Encode one input column as float32
+
+        Flags become 0/1, categoricals their label_encoders code (-1 for a
+        category unseen in training) and everything else is read as a number,
+        with NaN where it is missing.
+        """
+        values = pd.Series(values)
+        if feature in FLAG_FEATURES:
+            return parse_flags(values).to_numpy(dtype=np.float32)
+
+        if feature in CATEGORICAL_FEATURES:
+            # Encode each distinct label once, then spread the codes over the rows
+            codes, labels = factorize_labels(values)
+            labels = pd.Index(labels).str.strip().to_numpy(dtype=object)
+            if fit or feature not in self.label_encoders:
+                self.label_encoders[feature] = LabelEncoder().fit(labels[np.unique(codes)])
+            classes = self.label_encoders[feature].classes_
+            positions = np.searchsorted(classes, labels).clip(max=len(classes) - 1)
+            encoded = np.where(classes[positions] == labels, positions, -1).astype(np.float32)
+            return encoded[codes]
+
+        return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float32)
+
+    def _feature_cache_key(self, df, features):
+        variant = f"features-v{FEATURE_FORMAT_VERSION}:" + ','.join(features)
+        if self.dataset_key is not None:
+            # The key names the whole cleaned dataset; the length and index tell
+            # it apart from subsets of it, such as a filtered cohort
+            index = hashlib.sha256(pd.util.hash_pandas_object(df.index).to_numpy().tobytes()).hexdigest()[:16]
+            source = f"{self.dataset_key}-{len(df)}-{index}"
+        else:
+            source = hashlib.sha256(pd.util.hash_pandas_object(df[features], index=False).to_numpy().tobytes()).hexdigest()
+        return f"{source}-{hashlib.sha256(variant.encode()).hexdigest()[:12]}"
+
+    @traced_stage('build_feature_matrix', rows_out=lambda result: len(result[0]))
+    def build_feature_matrix(self, df):
+        """Engineered input matrix for classification and clustering
+
+        Returns (matrix, features): a C-contiguous float32 array with one column
+        per model input present in df, missing values filled with the column
+        median. Matrices are cached by dataset hash (in memory, and on disk
+        with a dataset_cache), so retraining and clustering reuse them.
+        """
+        features = [f for f in dict.fromkeys(CLASSIFICATION_FEATURES + CLUSTER_FEATURES) if f in df.columns]
+        key = self._feature_cache_key(df, features)
+
+        cached = self.feature_matrices.get(key)
+        if cached is None and self.dataset_cache is not None:
+            cached = self.dataset_cache.load_array(key)
+        if cached is not None:
+            matrix, meta = cached
+            self._restore_feature_meta(meta)
+            self.feature_matrices[key] = cached
+            return matrix, meta['features']
+
+        matrix = np.empty((len(df), len(features)), dtype=np.float32)
+        for i, feature in enumerate(features):
+            matrix[:, i] = self.encode_feature(feature, df[feature], fit=True)
+
+        medians = np.nan_to_num(np.nanmedian(matrix, axis=0)) if len(df) else np.zeros(len(features), dtype=np.float32)
+        missing = np.isnan(matrix)
+        if missing.any():
+            matrix[missing] = np.take(medians, np.nonzero(missing)[1])
+
+        meta = {
+            'features': features,
+            'medians': {feature: float(value) for feature, value in zip(features, medians)},
+            'encoders': {
+                feature: self.label_encoders[feature].classes_.tolist()
+                for feature in features if feature in CATEGORICAL_FEATURES
+            },
+        }
+        self.feature_medians.update(meta['medians'])
+        self.feature_matrices[key] = (matrix, meta)
+        if self.dataset_cache is not None:
+            self.dataset_cache.store_array(key, matrix, meta)
+        return matrix, features
+
+    def _restore_feature_meta(self, meta):
+        self.feature_medians.update(meta['medians'])
+        for feature, classes in meta['encoders'].items():
+            encoder = LabelEncoder()
+            encoder.classes_ = np.array(classes, dtype=object)
+            self.label_encoders[feature] = encoder
+
+    def feature_matrix_entry(self, df):
+        """(matrix, meta) of build_feature_matrix(df); meta holds the features, medians and encoders"""
+        matrix, features = self.build_feature_matrix(df)
+        return matrix, self.feature_matrices[self._feature_cache_key(df, features)][1]
+
+    def adopt_feature_matrix(self, df, matrix, meta):
+        """Reuse a matrix from feature_matrix_entry, so build_feature_matrix(df) returns it as is"""
+        self._restore_feature_meta(meta)
+        self.feature_matrices[self._feature_cache_key(df, meta['features'])] = (matrix, meta)
+
+    def _select_features(self, matrix, features, wanted):
+        available = [f for f in wanted if f in features]
+        columns = [features.index(f) for f in available]
+        return np.ascontiguousarray(matrix[:, columns]), available
+
+    @traced_stage('train_classification_model')
     def train_classification_model(self, df):
         """Train Decision Tree for performance classification"""
         try:
             # Select numerical features for classification
-            feature_columns = ['age', 'current_semester', 'attendance', 'credits_completed']
-            available_features = [col for col in feature_columns if col in df.columns]
+            matrix, features = self.build_feature_matrix(df)
+            X, available_features = self._select_features(matrix, features, CLASSIFICATION_FEATURES)
 
             if len(available_features) < 2:
                 print("Insufficient features for classification")
                 return 0.0
 
-            X = df[available_features].fillna(df[available_features].median())
             y = df['Performance_Category'] if 'Performance_Category' in df.columns else df.iloc[:, -1]
+            y = y.astype(str).to_numpy()
 
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -81,6 +285,10 @@ class StudentPerformanceAnalyzer:
             y_pred = self.dt_classifier.predict(X_test)
             accuracy = accuracy_score(y_test, y_pred)
 
+            self.classification_features = available_features
+            self.accuracy = accuracy
+            self.feature_profile = feature_profile(X, available_features)
+
             print(f"Classification Model Trained Successfully!")
             print(f"Accuracy: {accuracy:.3f}")
             print(f"Features used: {available_features}")
@@ -89,30 +297,121 @@ class StudentPerformanceAnalyzer:
 
         except Exception as e:
             print(f"Error in classification: {e}")
+            self.trace.fail(e)
+            return 0.0
+
+    @traced_stage('tune_classification_model')
+    def tune_classification_model(self, df, param_grid=None, n_folds=5, n_jobs=None, compare_serial=False):
+        """Train the Decision Tree with the best parameters and feature subset found by grid search
+
+        Candidates are scored with k-fold cross-validation on the training
+        split across a process pool; the winner is refit on the whole training
+        split and evaluated on the same held-out 20% as train_classification_model.
+        With compare_serial the search is repeated in-process to measure speedup.
+        """
+        try:
+            matrix, all_features = self.build_feature_matrix(df)
+            X, available_features = self._select_features(matrix, all_features, CLASSIFICATION_FEATURES)
+
+            if len(available_features) < 2:
+                print("Insufficient features for classification")
+                return 0.0
+
+            y = df['Performance_Category'] if 'Performance_Category' in df.columns else df.iloc[:, -1]
+            y = y.astype(str).to_numpy()
+
+            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+            search = grid_search(X_train, y_train, param_grid=param_grid, n_folds=n_folds, n_jobs=n_jobs)
+            best = search['results'][0]
+            columns = list(best['columns'])
+            features = [available_features[i] for i in columns]
+
+            self.dt_classifier = DecisionTreeClassifier(random_state=42, **best['params'])
+            self.dt_classifier.fit(X_train[:, columns], y_train)
+            accuracy = accuracy_score(y_test, self.dt_classifier.predict(X_test[:, columns]))
+
+            self.classification_features = features
+            self.accuracy = accuracy
+            self.feature_profile = feature_profile(X[:, columns], features)
+            self.tuning_report = {
+                'best_params': best['params'],
+                'best_features': features,
+                'cv_accuracy': best['cv_accuracy'],
+                'test_accuracy': accuracy,
+                'candidates': search['candidates'],
+                'folds': search['folds'],
+                'n_jobs': search['n_jobs'],
+                'seconds': search['seconds'],
+                'top_candidates': [
+                    {
+                        'params': result['params'],
+                        'features': [available_features[i] for i in result['columns']],
+                        'cv_accuracy': result['cv_accuracy'],
+                    }
+                    for result in search['results'][:10]
+                ],
+            }
+
+            if compare_serial:
+                serial = grid_search(X_train, y_train, param_grid=param_grid, n_folds=n_folds, n_jobs=1)
+                self.tuning_report['serial_seconds'] = serial['seconds']
+                self.tuning_report['speedup'] = serial['seconds'] / search['seconds'] if search['seconds'] > 0 else None
+
+            print(f"Tuned over {search['candidates']} candidates with {n_folds}-fold CV in {search['seconds']:.1f}s")
+            print(f"Best parameters: {best['params']}, features: {features}")
+            print(f"Accuracy: {accuracy:.3f}")
+
+            return accuracy
+
+        except Exception as e:
+            print(f"Error tuning classification: {e}")
+            self.trace.fail(e)
             return 0.0
 
-    def perform_clustering(self, df):
-        """Perform K-means clustering"""
+    @traced_stage('perform_clustering')
+    def perform_clustering(self, df, n_clusters=3, k_values=None, n_jobs=None):
+        """Perform K-means clustering
+
+        With k_values, every k is fitted in parallel and the one with the best
+        (sampled) silhouette is kept; its diagnostics go to cluster_selection.
+        n_clusters is used when none of k_values fits the number of rows.
+        """
         try:
             # Select features for clustering
-            cluster_features = ['current_cgpa', 'attendance']
-            available_features = [col for col in cluster_features if col in df.columns]
+            matrix, features = self.build_feature_matrix(df)
+            X_cluster, available_features = self._select_features(matrix, features, CLUSTER_FEATURES)
 
             if len(available_features) < 2:
                 print("Insufficient features for clustering")
                 return None
 
-            X_cluster = df[available_features].fillna(df[available_features].median())
-
             # Scale features
             X_scaled = self.scaler.fit_transform(X_cluster)
 
             # Perform K-means clustering
-            self.kmeans_model = KMeans(n_clusters=3, random_state=42)
-            cluster_labels = self.kmeans_model.fit_predict(X_scaled)
+            selection = select_k(X_scaled, k_values=k_values, n_jobs=n_jobs) if k_values is not None else None
+            if k_values is not None and selection is None:
+                print(f"No k in {list(k_values)} fits {len(X_scaled)} rows; using k={n_clusters}")
+            if selection is not None:
+                self.kmeans_model = selection['model']
+                self.cluster_selection = {
+                    'k': selection['k'],
+                    'criterion': 'silhouette',
+                    'diagnostics': selection['diagnostics'],
+                    'seconds': selection['seconds'],
+                }
+                cluster_labels = self.kmeans_model.labels_
+                print(f"Selected k={selection['k']} from {[d['k'] for d in selection['diagnostics']]}")
+            else:
+                self.kmeans_model = KMeans(n_clusters=n_clusters, random_state=42)
+                cluster_labels = self.kmeans_model.fit_predict(X_scaled)
+                self.cluster_selection = None
+            self.cluster_features = available_features
 
             # Add cluster labels to dataframe
             df['Cluster'] = cluster_labels
+            self.cluster_counts = np.bincount(cluster_labels, minlength=self.kmeans_model.n_clusters)
 
             # Analyze clusters
             cluster_analysis = df.groupby('Cluster')[available_features].mean()
@@ -124,34 +423,151 @@ class StudentPerformanceAnalyzer:
 
         except Exception as e:
             print(f"Error in clustering: {e}")
+            self.trace.fail(e)
             return None
 
-    def generate_association_rules(self, df):
-        """Generate association rules"""
+    def _encoded_matrix(self, df, wanted):
+        """Encoded columns of a frame, missing values filled with training medians"""
+        features = [f for f in wanted if f in df.columns]
+        X = np.empty((len(df), len(features)), dtype=np.float32)
+        for i, feature in enumerate(features):
+            column = self.encode_feature(feature, df[feature])
+            X[:, i] = np.where(np.isnan(column), self.feature_medians.get(feature, 0.0), column)
+        return X, features
+
+    def _cluster_matrix(self, df):
+        """Encoded clustering inputs of a frame, missing values filled with training medians"""
+        return self._encoded_matrix(df, CLUSTER_FEATURES)
+
+    @traced_stage('perform_streaming_clustering', rows_out=lambda result: result['rows'])
+    def perform_streaming_clustering(self, file_path, n_clusters=3, chunk_size=DEFAULT_CHUNK_SIZE,
+                                     batch_size=4096, compute_inertia=True):
+        """Fit K-means incrementally over a dataset file too large for memory
+
+        One pass fits the scaler with partial_fit, the next feeds MiniBatchKMeans
+        one mini-batch at a time, so peak memory depends on chunk_size and not
+        on the file. With compute_inertia a final pass totals the inertia and
+        cluster sizes. Returns {'rows', 'inertia', 'cluster_sizes'}.
+        """
         try:
-            rules = []
+            loader = StreamingDatasetLoader(file_path, chunk_size=chunk_size, analyzer=self)
+            loader.compute_fill_values()
+            self.feature_medians.update({
+                f: float(loader.fill_values[f]) for f in CLUSTER_FEATURES if f in loader.fill_values
+            })
+
+            self.scaler = StandardScaler()
+            self.cluster_selection = None
+            self.cluster_counts = None
+            available_features = []
+            for chunk in loader.iter_chunks():
+                X, available_features = self._cluster_matrix(chunk)
+                if len(available_features) < 2:
+                    print("Insufficient features for clustering")
+                    return None
+                self.scaler.partial_fit(X)
+
+            self.kmeans_model = MiniBatchKMeans(n_clusters=n_clusters, random_state=42, batch_size=batch_size, n_init=3)
+            for chunk in loader.iter_chunks():
+                X_scaled = self.scaler.transform(self._cluster_matrix(chunk)[0])
+                for start in range(0, len(X_scaled), batch_size):
+                    self.kmeans_model.partial_fit(X_scaled[start:start + batch_size])
+            self.cluster_features = available_features
+
+            result = {'rows': loader.total_rows, 'inertia': None, 'cluster_sizes': None}
+            if compute_inertia:
+                inertia = 0.0
+                sizes = np.zeros(n_clusters, dtype=np.int64)
+                for chunk in loader.iter_chunks():
+                    X_scaled = self.scaler.transform(self._cluster_matrix(chunk)[0])
+                    inertia -= self.kmeans_model.score(X_scaled)
+                    sizes += np.bincount(self.kmeans_model.predict(X_scaled), minlength=n_clusters)
+                result['inertia'] = float(inertia)
+                result['cluster_sizes'] = sizes.tolist()
+                self.cluster_counts = sizes
+
+            print("Streaming clustering completed successfully!")
+            print(f"Rows: {result['rows']}, cluster sizes: {result['cluster_sizes']}")
+            return result
 
-            # Rule 1: High attendance -> Good performance
-            if 'attendance' in df.columns and 'Performance_Category' in df.columns:
-                high_attendance = df['attendance'] >= 85
-                good_performance = df['Performance_Category'].isin(['Distinction', 'First Class'])
-
-                support = (high_attendance & good_performance).sum() / len(df)
-                confidence = (high_attendance & good_performance).sum() / high_attendance.sum() if high_attendance.sum() > 0 else 0
+        except Exception as e:
+            print(f"Error in streaming clustering: {e}")
+            self.trace.fail(e)
+            return None
 
-                rules.append({
-                    'antecedent': 'High Attendance (>=85%)',
-                    'consequent': 'Good Performance',
-                    'support': support,
-                    'confidence': confidence,
-                    'lift': confidence / (good_performance.sum() / len(df)) if good_performance.sum() > 0 else 0
-                })
+    def assign_clusters(self, df):
+        """Cluster of each student in df under the fitted model, without refitting"""
+        X, _ = self._cluster_matrix(df.reindex(columns=self.cluster_features))
+        return self.kmeans_model.predict(self.scaler.transform(X))
+
+    @traced_stage('update_clustering_online')
+    def update_clustering_online(self, df, previous=None):
+        """Move the fitted cluster centres towards new rows without refitting
+
+        Each row joins its nearest centre under the fitted scaler, and each
+        centre becomes the mean of every row it has absorbed, weighted by
+        cluster_counts. previous holds the rows already absorbed for students
+        who reappear in df: they leave their nearest centre first, so updated
+        students are not counted twice. Cost depends on len(df) and
+        len(previous) only. Returns the labels of df's rows.
+        """
+        centers = self.kmeans_model.cluster_centers_
+        counts = np.array(self.cluster_counts, dtype=np.int64)
+        sums = centers.astype(np.float64) * counts[:, np.newaxis]
+        touched = np.zeros(len(centers), dtype=bool)
+
+        # Both sets of rows are assigned under the current centres, before any of them move
+        if previous is not None and len(previous):
+            old_labels, old_scaled = self._cluster_points(previous)
+            np.subtract.at(sums, old_labels, old_scaled)
+            np.subtract.at(counts, old_labels, 1)
+            touched[old_labels] = True
+        labels, X_scaled = self._cluster_points(df)
+        np.add.at(sums, labels, X_scaled)
+        np.add.at(counts, labels, 1)
+        touched[labels] = True
+
+        counts = np.maximum(counts, 0)
+        updated = sums / np.maximum(counts, 1)[:, np.newaxis]
+        # Untouched and emptied clusters keep their centres
+        keep = ~touched | (counts == 0)
+        self.kmeans_model.cluster_centers_ = np.where(keep[:, np.newaxis], centers, updated).astype(centers.dtype)
+        self.cluster_counts = counts
+        return labels
+
+    def _cluster_points(self, df):
+        X, _ = self._encoded_matrix(df.reindex(columns=self.cluster_features), self.cluster_features)
+        X_scaled = self.scaler.transform(X)
+        return self.kmeans_model.predict(X_scaled), X_scaled
+
+    def classification_drift(self, df):
+        """Population Stability Index of each classifier input between the training data and df"""
+        X, features = self._encoded_matrix(df, self.classification_features)
+        return feature_drift(self.feature_profile, X, features)
+
+    @traced_stage('generate_association_rules', rows_out=len)
+    def generate_association_rules(self, df, min_support=0.05, min_confidence=0.5, min_lift=1.0, max_len=3):
+        """Generate association rules
+
+        Mines frequent itemsets over discretized attendance, study hours,
+        social media hours, co-curricular, scholarship and performance
+        category, and returns rules whose consequent is a performance item.
+        """
+        try:
+            rules = mine_association_rules(
+                df,
+                min_support=min_support,
+                min_confidence=min_confidence,
+                min_lift=min_lift,
+                max_len=max_len,
+            )
 
             print(f"Generated {len(rules)} association rules")
             return rules
 
         except Exception as e:
             print(f"Error generating association rules: {e}")
+            self.trace.fail(e)
             return []
 
     def predict_performance(self, student_data):
@@ -160,31 +576,61 @@ class StudentPerformanceAnalyzer:
             if self.dt_classifier is None:
                 return "Model not trained", 0.0
 
-            prediction = self.dt_classifier.predict([student_data])
-            probabilities = self.dt_classifier.predict_proba([student_data])
-            confidence = max(probabilities[0])
-
-            return prediction[0], confidence
+            return self.compiled_classifier().predict_one(student_data)
 
         except Exception as e:
             print(f"Error in prediction: {e}")
             return "Error", 0.0
 
-    def save_models(self):
+    def predict_performance_batch(self, students):
+        """Predict performance for many students in one vectorized tree traversal
+
+        students is a 2-D array-like with one row per student in the order of
+        classification_features. Returns (labels, confidences) arrays.
+        """
+        return self.compiled_classifier().predict(students)
+
+    def compiled_classifier(self):
+        """Flat-array copy of dt_classifier for fast inference, rebuilt when the classifier changes"""
+        if self._compiled_tree is None or self._compiled_tree[0] is not self.dt_classifier:
+            self._compiled_tree = (self.dt_classifier, CompiledTree(self.dt_classifier))
+        return self._compiled_tree[1]
+
+    def get_model_bundle(self):
+        """Everything needed to serve predictions without retraining"""
+        return {
+            'dt_classifier': self.dt_classifier,
+            'kmeans_model': self.kmeans_model,
+            'scaler': self.scaler,
+            'label_encoders': self.label_encoders,
+            'classification_features': self.classification_features,
+            'cluster_features': self.cluster_features,
+            'feature_medians': self.feature_medians,
+            'accuracy': self.accuracy,
+            'cluster_counts': self.cluster_counts,
+            'feature_profile': self.feature_profile,
+        }
+
+    def load_model_bundle(self, bundle):
+        """Restore trained models from a bundle produced by get_model_bundle"""
+        for name, value in bundle.items():
+            setattr(self, name, value)
+
+    def save_models(self, file_path='models.pkl'):
         """Save trained models"""
         try:
-            if self.dt_classifier:
-                with open('decision_tree_model.pkl', 'wb') as f:
-                    pickle.dump(self.dt_classifier, f)
-
-            if self.kmeans_model:
-                with open('kmeans_model.pkl', 'wb') as f:
-                    pickle.dump(self.kmeans_model, f)
+            with open(file_path, 'wb') as f:
+                pickle.dump(self.get_model_bundle(), f, protocol=pickle.HIGHEST_PROTOCOL)
 
             print("Models saved successfully!")
         except Exception as e:
             print(f"Error saving models: {e}")
 
+    def load_models(self, file_path='models.pkl'):
+        """Load models saved by save_models"""
+        with open(file_path, 'rb') as f:
+            self.load_model_bundle(pickle.load(f))
+
 # Example usage
 if __name__ == "__main__":
     analyzer = StudentPerformanceAnalyzer()
@@ -0,0 +1,128 @@
+import os
+import pickle
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from .ml_algorithms import StudentPerformanceAnalyzer
+from .models import ModelVersion
+from .aggregates import invalidate_aggregates
+from .prediction_cache import get_prediction_cache
+
+# How often a serving process checks whether another process promoted a new version
+REFRESH_INTERVAL_SECONDS = 30
+
+
+def _artifact_dir():
+    path = os.path.join(settings.MEDIA_ROOT, 'models')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _feature_importance(analyzer):
+    if analyzer.dt_classifier is None:
+        return {}
+    return {
+        feature: float(value)
+        for feature, value in zip(analyzer.classification_features, analyzer.dt_classifier.feature_importances_)
+    }
+
+
+def register_model(analyzer, training_data_hash='', metadata=None, activate=True):
+    """Store the analyzer's trained models as a new version, optionally making it active"""
+    with transaction.atomic():
+        version = ModelVersion.objects.create(
+            artifact_path='',
+            classification_features=list(analyzer.classification_features),
+            cluster_features=list(analyzer.cluster_features),
+            training_data_hash=training_data_hash,
+            accuracy=float(analyzer.accuracy) if analyzer.accuracy is not None else None,
+            metadata={
+                'feature_medians': {k: float(v) for k, v in analyzer.feature_medians.items()},
+                'feature_importance': _feature_importance(analyzer),
+                'cluster_selection': analyzer.cluster_selection,
+                **(metadata or {}),
+            },
+        )
+
+        # Write under a temporary name so a half-written artifact is never loaded
+        artifact_path = os.path.join(_artifact_dir(), f"model_v{version.pk}.pkl")
+        tmp_path = artifact_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(analyzer.get_model_bundle(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, artifact_path)
+
+        version.artifact_path = artifact_path
+        version.save(update_fields=['artifact_path'])
+
+        if activate:
+            promote(version)
+    return version
+
+
+def promote(version):
+    """Make a version the active one for every serving process"""
+    with transaction.atomic():
+        ModelVersion.objects.filter(is_active=True).exclude(pk=version.pk).update(is_active=False)
+        ModelVersion.objects.filter(pk=version.pk).update(is_active=True)
+    version.is_active = True
+    transaction.on_commit(_registry.invalidate)
+    transaction.on_commit(get_prediction_cache().clear)
+    transaction.on_commit(invalidate_aggregates)
+
+
+def load_version(version):
+    """Build an analyzer holding the models of a stored version"""
+    analyzer = StudentPerformanceAnalyzer()
+    with open(version.artifact_path, 'rb') as f:
+        analyzer.load_model_bundle(pickle.load(f))
+    return analyzer
+
+
+class ActiveModelRegistry:
+    """
+    Per-process holder for the active model version
+    The artifact is loaded lazily on first use and then shared by every
+    request thread; the database is re-checked at most every
+    REFRESH_INTERVAL_SECONDS to pick up promotions from other processes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = (None, None)
+        self._checked_at = float('-inf')
+
+    def get(self):
+        """Return (version, analyzer) for the active model, or (None, None)"""
+        if time.monotonic() - self._checked_at < REFRESH_INTERVAL_SECONDS:
+            return self._active
+
+        with self._lock:
+            if time.monotonic() - self._checked_at >= REFRESH_INTERVAL_SECONDS:
+                self._refresh()
+            return self._active
+
+    def _refresh(self):
+        active = ModelVersion.objects.filter(is_active=True).order_by('-pk').first()
+        current = self._active[0]
+        if active is None:
+            self._active = (None, None)
+        elif current is None or active.pk != current.pk:
+            # Swap version and analyzer together so readers never see a mismatched pair
+            self._active = (active, load_version(active))
+        self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Force the next get() to re-read the active version"""
+        with self._lock:
+            self._checked_at = float('-inf')
+
+
+_registry = ActiveModelRegistry()
+
+
+def get_active_model():
+    """Return (ModelVersion, StudentPerformanceAnalyzer) for the active model"""
+    return _registry.get()
@@ -0,0 +1,225 @@
+"""
+Hyperparameter search for the performance classifier and the clustering
+Every classifier candidate (tree parameters plus a feature subset) is scored
+with k-fold cross-validation, and every cluster count k with inertia and
+silhouette, on a process pool. The training arrays are placed in shared
+memory once and workers attach to them, so no task carries a copy of the data.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, product
+from multiprocessing import get_context, shared_memory
+import os
+import time
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+DEFAULT_PARAM_GRID = {
+    'max_depth': [4, 6, 8, 10, 12, None],
+    'min_samples_leaf': [1, 5, 20, 50],
+    'criterion': ['gini', 'entropy'],
+}
+DEFAULT_CV_FOLDS = 5
+MIN_SUBSET_SIZE = 2
+# Above this many features, try the full set and each leave-one-out subset
+# instead of every combination
+MAX_EXHAUSTIVE_FEATURES = 5
+RANDOM_STATE = 42
+
+DEFAULT_K_VALUES = range(2, 9)
+# Silhouette is quadratic in the number of points, so larger inputs are sampled
+SILHOUETTE_SAMPLE_SIZE = 10_000
+# A k whose smallest cluster holds less than this share of students is only
+# chosen when no other k avoids such an outlier cluster
+MIN_CLUSTER_FRACTION = 0.01
+
+# Arrays attached by a pool worker, keyed by name ('X', 'y', 'folds')
+_worker_arrays = {}
+_worker_blocks = []
+
+
+def feature_subsets(n_features, min_size=MIN_SUBSET_SIZE):
+    """Subsets of column indices to try: all of them with at least min_size columns for few features"""
+    if n_features > MAX_EXHAUSTIVE_FEATURES:
+        everything = tuple(range(n_features))
+        return [everything] + [everything[:i] + everything[i + 1:] for i in range(n_features)]
+
+    min_size = min(min_size, n_features)
+    return [
+        columns
+        for size in range(min_size, n_features + 1)
+        for columns in combinations(range(n_features), size)
+    ]
+
+
+def candidate_grid(n_features, param_grid=None, subsets=None):
+    """Cartesian product of parameter values and feature subsets as (params, columns) pairs"""
+    param_grid = param_grid or DEFAULT_PARAM_GRID
+    subsets = subsets if subsets is not None else feature_subsets(n_features)
+    names = list(param_grid)
+    return [
+        (dict(zip(names, values)), tuple(columns))
+        for values in product(*(param_grid[name] for name in names))
+        for columns in subsets
+    ]
+
+
+def assign_folds(y, n_folds=DEFAULT_CV_FOLDS, random_state=RANDOM_STATE):
+    """Stratified fold number for every row"""
+    folds = np.empty(len(y), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    for fold, (_, test_index) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        folds[test_index] = fold
+    return folds
+
+
+def cross_val_accuracy(params, columns, X, y, folds):
+    """Mean held-out accuracy of a tree over the folds"""
+    X = X[:, list(columns)]
+    scores = []
+    for fold in range(int(folds.max()) + 1):
+        test = folds == fold
+        model = DecisionTreeClassifier(random_state=RANDOM_STATE, **params)
+        model.fit(X[~test], y[~test])
+        scores.append(np.mean(model.predict(X[test]) == y[test]))
+    return float(np.mean(scores))
+
+
+class SharedArrays:
+    """Copies named numpy arrays into shared memory blocks for the lifetime of a with block"""
+
+    def __init__(self, **arrays):
+        self.arrays = arrays
+        self.blocks = []
+        self.specs = {}
+
+    def __enter__(self):
+        for name, array in self.arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+        return self
+
+    def __exit__(self, *exc_info):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+
+def _attach_shared_arrays(specs):
+    """Pool initializer: map the parent's shared blocks as read-only arrays"""
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        _worker_blocks.append(block)
+        _worker_arrays[name] = array
+
+
+def _score_in_worker(candidate):
+    params, columns = candidate
+    return cross_val_accuracy(params, columns, _worker_arrays['X'], _worker_arrays['y'], _worker_arrays['folds'])
+
+
+def _pool(n_jobs, shared):
+    # spawn rather than fork: callers may be threaded (job queue, web server)
+    return ProcessPoolExecutor(
+        max_workers=n_jobs,
+        mp_context=get_context('spawn'),
+        initializer=_attach_shared_arrays,
+        initargs=(shared.specs,),
+    )
+
+
+def grid_search(X, y, param_grid=None, subsets=None, n_folds=DEFAULT_CV_FOLDS, n_jobs=None):
+    """
+    Score every candidate with k-fold cross-validation
+    n_jobs=1 runs in this process; otherwise candidates are spread over a
+    pool of n_jobs processes (default: one per CPU). Returns the candidates
+    ranked best first together with the wall-clock time taken.
+    """
+    # Trees train on float32 internally, so this is also the cheapest layout to share
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    _, y = np.unique(np.asarray(y), return_inverse=True)
+    folds = assign_folds(y, n_folds)
+    candidates = candidate_grid(X.shape[1], param_grid, subsets)
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if n_jobs == 1:
+        scores = [cross_val_accuracy(params, columns, X, y, folds) for params, columns in candidates]
+    else:
+        with SharedArrays(X=X, y=y, folds=folds) as shared:
+            with _pool(n_jobs, shared) as executor:
+                chunksize = max(1, len(candidates) // (n_jobs * 4))
+                scores = list(executor.map(_score_in_worker, candidates, chunksize=chunksize))
+    seconds = time.perf_counter() - start
+
+    ranked = sorted(
+        ({'params': params, 'columns': columns, 'cv_accuracy': score} for (params, columns), score in zip(candidates, scores)),
+        key=lambda result: result['cv_accuracy'],
+        reverse=True,
+    )
+    return {'results': ranked, 'candidates': len(candidates), 'folds': n_folds, 'n_jobs': n_jobs, 'seconds': seconds}
+
+
+def evaluate_k(k, X):
+    """Fit KMeans with k clusters and measure it; returns (diagnostics, fitted model)"""
+    model = KMeans(n_clusters=k, random_state=RANDOM_STATE, n_init=10)
+    labels = model.fit_predict(X)
+    sizes = np.bincount(labels, minlength=k)
+    silhouette = silhouette_score(
+        X, labels, sample_size=min(len(X), SILHOUETTE_SAMPLE_SIZE), random_state=RANDOM_STATE,
+    )
+    diagnostics = {
+        'k': k,
+        'inertia': float(model.inertia_),
+        'silhouette': float(silhouette),
+        'min_cluster_size': int(sizes.min()),
+    }
+    return diagnostics, model
+
+
+def _evaluate_k_in_worker(k):
+    return evaluate_k(k, _worker_arrays['X'])
+
+
+def select_k(X, k_values=DEFAULT_K_VALUES, n_jobs=None, min_cluster_fraction=MIN_CLUSTER_FRACTION):
+    """
+    Fit KMeans for every k and pick the one with the best silhouette
+    Candidates with a cluster smaller than min_cluster_fraction of the rows
+    only win if every candidate has one. Returns the chosen k, its fitted
+    model, per-k diagnostics and the wall-clock time, or None when no k in
+    k_values is possible for the number of rows.
+    """
+    X = np.ascontiguousarray(X)
+    k_values = [k for k in k_values if 2 <= k < len(X)]
+    if not k_values:
+        return None
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(k_values))
+
+    start = time.perf_counter()
+    if n_jobs <= 1:
+        evaluated = [evaluate_k(k, X) for k in k_values]
+    else:
+        with SharedArrays(X=X) as shared:
+            with _pool(n_jobs, shared) as executor:
+                evaluated = list(executor.map(_evaluate_k_in_worker, k_values))
+    seconds = time.perf_counter() - start
+
+    min_size = min_cluster_fraction * len(X)
+    eligible = [pair for pair in evaluated if pair[0]['min_cluster_size'] >= min_size] or evaluated
+    best, model = max(eligible, key=lambda pair: pair[0]['silhouette'])
+    return {
+        'k': best['k'],
+        'model': model,
+        'diagnostics': [diagnostics for diagnostics, _ in evaluated],
+        'n_jobs': n_jobs,
+        'seconds': seconds,
+    }
@@ -24,6 +24,7 @@ class AcademicRecord(models.Model):
     probation = models.BooleanField(default=False)
     suspension = models.BooleanField(default=False)
     performance_category = models.CharField(max_length=50)
+    semester = models.IntegerField(null=True, blank=True)  # student's semester when recorded
 
     def __str__(self):
         return f"{self.student.roll_no} - CGPA: {self.current_cgpa}"
@@ -43,11 +44,125 @@ class StudentBehavior(models.Model):
         return f"{self.student.roll_no} - Behavior Data"
 
 class Prediction(models.Model):
-    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    # Anonymous API calls are recorded without a student
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, null=True, blank=True)
+    model_version = models.ForeignKey('ModelVersion', on_delete=models.SET_NULL, null=True, blank=True)
     predicted_performance = models.CharField(max_length=50)
     confidence_score = models.FloatField()
-    cluster_group = models.IntegerField()
+    cluster_group = models.IntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.student.roll_no if self.student else 'anonymous'} - {self.predicted_performance}"
+
+class IngestedDataset(models.Model):
+    """A dataset file already written to the fact tables, by content hash"""
+    content_hash = models.CharField(max_length=64, unique=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    rows = models.IntegerField(default=0)
+    ingested_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.file_name or self.content_hash[:12]} ({self.rows} rows)"
+
+class Job(models.Model):
+    status_choices = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=status_choices, default='queued')
+    progress = models.FloatField(default=0.0)  # 0.0 - 1.0
+    message = models.CharField(max_length=255, blank=True)
+    payload = models.JSONField(default=dict)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=255, blank=True)  # host:pid running the job
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} - {self.status}"
+
+class ModelVersion(models.Model):
+    artifact_path = models.CharField(max_length=255)
+    classification_features = models.JSONField(default=list)
+    cluster_features = models.JSONField(default=list)
+    training_data_hash = models.CharField(max_length=128, blank=True)
+    accuracy = models.FloatField(null=True, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    is_active = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"v{self.pk}{' (active)' if self.is_active else ''}"
+
+class PerformanceSummary(models.Model):
+    """Running totals of AcademicRecord rows per semester/admission year/category"""
+    semester = models.IntegerField()
+    admission_year = models.IntegerField()
+    performance_category = models.CharField(max_length=50)
+    record_count = models.BigIntegerField(default=0)
+    cgpa_sum = models.FloatField(default=0.0)
+    attendance_sum = models.FloatField(default=0.0)
+    credits_sum = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['semester', 'admission_year', 'performance_category'],
+                name='unique_performance_summary',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Sem {self.semester} / {self.admission_year} / {self.performance_category}: {self.record_count}"
+
+class ClusterSummary(models.Model):
+    """Running totals of the students in each cluster per model version"""
+    model_version = models.ForeignKey(ModelVersion, on_delete=models.CASCADE)
+    cluster_group = models.IntegerField()
+    student_count = models.BigIntegerField(default=0)
+    cgpa_sum = models.FloatField(default=0.0)
+    attendance_sum = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model_version', 'cluster_group'], name='unique_cluster_summary'),
+        ]
+
+    def __str__(self):
+        return f"v{self.model_version_id} cluster {self.cluster_group}: {self.student_count}"
+
+class ClusterMembership(models.Model):
+    """A student's latest cluster under a model version, with the values it added to ClusterSummary"""
+    model_version = models.ForeignKey(ModelVersion, on_delete=models.CASCADE)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    cluster_group = models.IntegerField()
+    cgpa = models.FloatField(default=0.0)
+    attendance = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model_version', 'student'], name='unique_cluster_membership'),
+        ]
+
+    def __str__(self):
+        return f"v{self.model_version_id} {self.student_id} -> cluster {self.cluster_group}"
+
+class AnalyticsCounter(models.Model):
+    """Named running totals, e.g. number of students and predictions"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+
     def __str__(self):
-        return f"{self.student.roll_no} - {self.predicted_performance}"
+        return f"{self.name} = {self.value}"
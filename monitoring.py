@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+from .instrumentation import COUNT_BUCKETS, SamplingProfiler, get_metrics_registry
+from .prediction_cache import get_prediction_cache
+
+DEFAULT_PROFILE_SLOW_SECONDS = 1.0
+DEFAULT_PROFILE_INTERVAL = 0.005
+
+_registry = get_metrics_registry()
+REQUEST_SECONDS = _registry.histogram(
+    'http_request_duration_seconds', 'Latency of requests by view', ('view', 'method', 'status'),
+)
+REQUEST_QUERIES = _registry.histogram(
+    'http_request_db_queries', 'Database queries issued per request', ('view',), buckets=COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = _registry.histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request', ('view',),
+)
+REQUEST_TEMPLATE_SECONDS = _registry.histogram(
+    'http_request_template_duration_seconds', 'Time spent rendering templates per request', ('view',),
+)
+TEMPLATE_SECONDS = _registry.histogram(
+    'template_render_duration_seconds', 'Render time of each template', ('template',),
+)
+PROFILES_WRITTEN = _registry.counter(
+    'http_request_profiles', 'Slow requests whose sampled stacks were written', ('view',),
+)
+
+# Template time of the request being handled by this thread
+_request_state = threading.local()
+
+
+class _QueryTimer:
+    """execute_wrapper that counts queries and their time"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Record latency, database and template time for every request
+    Metrics are labelled with the resolved view name. With
+    ANALYTICS_PROFILER_ENABLED, the request's stack is sampled and requests
+    slower than ANALYTICS_PROFILE_SLOW_SECONDS are written to
+    ANALYTICS_PROFILE_DIR as flamegraph-compatible folded stacks.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.profiler_enabled = getattr(settings, 'ANALYTICS_PROFILER_ENABLED', False)
+        self.profile_slow_seconds = getattr(settings, 'ANALYTICS_PROFILE_SLOW_SECONDS', DEFAULT_PROFILE_SLOW_SECONDS)
+        self.profile_interval = getattr(settings, 'ANALYTICS_PROFILE_INTERVAL', DEFAULT_PROFILE_INTERVAL)
+        self.profile_dir = str(getattr(settings, 'ANALYTICS_PROFILE_DIR', os.path.join(settings.MEDIA_ROOT, 'profiles')))
+
+    def __call__(self, request):
+        timer = _QueryTimer()
+        _request_state.template_seconds = 0.0
+        profiler = SamplingProfiler(interval=self.profile_interval).start() if self.profiler_enabled else None
+
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.stop()
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else 'unresolved'
+        REQUEST_SECONDS.observe(elapsed, view=view, method=request.method, status=response.status_code)
+        REQUEST_QUERIES.observe(timer.queries, view=view)
+        REQUEST_DB_SECONDS.observe(timer.seconds, view=view)
+        REQUEST_TEMPLATE_SECONDS.observe(_request_state.template_seconds, view=view)
+
+        if profiler is not None and profiler.samples and elapsed >= self.profile_slow_seconds:
+            self._write_profile(profiler, view, elapsed)
+        return response
+
+    def _write_profile(self, profiler, view, elapsed):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{view.replace(':', '-')}-{int(elapsed * 1000)}ms.folded"
+        with open(os.path.join(self.profile_dir, name), 'w') as f:
+            f.write(profiler.folded())
+        PROFILES_WRITTEN.inc(view=view)
+
+
+class _TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            elapsed = time.perf_counter() - start
+            TEMPLATE_SECONDS.observe(elapsed, template=self.template.origin.template_name or '')
+            if hasattr(_request_state, 'template_seconds'):
+                _request_state.template_seconds += elapsed
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every render"""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return _TimedTemplate(template.template, self)
+
+
+def render_metrics():
+    """Prometheus text for the registry plus gauges read at scrape time"""
+    cache = get_prediction_cache().stats()
+    gauges = [
+        ('prediction_cache_hits', 'counter', 'Prediction cache hits', cache['hits']),
+        ('prediction_cache_misses', 'counter', 'Prediction cache misses', cache['misses']),
+        ('prediction_cache_evictions', 'counter', 'Prediction cache evictions', cache['evictions']),
+        ('prediction_cache_entries', 'gauge', 'Entries in the prediction cache', cache['size']),
+    ]
+    lines = []
+    for name, kind, help_text, value in gauges:
+        if kind == 'counter':
+            name += '_total'
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+    return _registry.render() + '\n'.join(lines) + '\n'
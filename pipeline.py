@@ -0,0 +1,307 @@
+"""
+Student analysis as a DAG of cached stages
+load -> clean -> features -> {classify, cluster, rules}. Each stage output is
+stored under a key derived from the stage's name, version and parameters and
+from the keys of its inputs, so a run executes only the stages whose inputs or
+settings changed. Stages whose inputs are ready run concurrently.
+Run with: python -m analytics.pipeline <dataset.csv> [--cache-dir DIR]
+"""
+import argparse
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .dataset_cache import CACHE_FORMAT_VERSION, DatasetCache, file_content_hash
+from .ml_algorithms import FEATURE_FORMAT_VERSION, StudentPerformanceAnalyzer
+from .model_tuning import DEFAULT_K_VALUES
+
+# Bump when the stage functions below change what they return
+PIPELINE_VERSION = 3
+DEFAULT_MEMORY_ENTRIES = 64
+ANALYSIS_TARGETS = ('classify', 'cluster', 'rules')
+
+
+class Stage:
+    """
+    One step of a Pipeline, called as func(*input_outputs, **params)
+    version is part of the cache key: change it whenever the function's output
+    for the same inputs would change. Stages with persist=False are only kept
+    in memory.
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, version=1, persist=True):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = dict(params or {})
+        self.version = version
+        self.persist = persist
+
+
+class ArtifactStore:
+    """
+    Stage outputs by key: a bounded in-memory LRU, backed by a DatasetCache
+    when one is given so outputs survive the process
+    """
+
+    def __init__(self, dataset_cache=None, max_memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.dataset_cache = dataset_cache
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, persist=True):
+        """(True, output) for a stored key, (False, None) on a miss"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return True, self._memory[key]
+        if persist and self.dataset_cache is not None:
+            value = self.dataset_cache.load_object(key)
+            if value is not None:
+                self._remember(key, value)
+                return True, value
+        return False, None
+
+    def put(self, key, value, persist=True):
+        self._remember(key, value)
+        if persist and self.dataset_cache is not None:
+            self.dataset_cache.store_object(key, value)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+
+class Pipeline:
+    """Stages wired by name; sources are named inputs supplied to run()"""
+
+    def __init__(self, stages, store=None, max_workers=None):
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage '{stage.name}'")
+            self.stages[stage.name] = stage
+        self.order = self._topological_order()
+        self.store = store if store is not None else ArtifactStore()
+        self.max_workers = max_workers
+
+    def _topological_order(self):
+        order, visiting = [], set()
+
+        def visit(name):
+            if name in order or name not in self.stages:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].inputs:
+                visit(dependency)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def keys(self, source_keys):
+        """Cache key of every stage, given a content key for each source"""
+        keys = dict(source_keys)
+        for name in self.order:
+            stage = self.stages[name]
+            missing = [i for i in stage.inputs if i not in keys]
+            if missing:
+                raise ValueError(f"Stage '{name}' needs unknown inputs {missing}")
+            description = json.dumps([
+                PIPELINE_VERSION,
+                name,
+                str(stage.version),
+                repr(sorted(stage.params.items())),
+                [keys[i] for i in stage.inputs],
+            ])
+            keys[name] = f"pipeline-{name}-{hashlib.sha256(description.encode()).hexdigest()[:32]}"
+        return keys
+
+    def run(self, sources, source_keys, targets=None, progress=None):
+        """
+        Produce the outputs of targets (default: every stage)
+        Stored outputs are reused; a stage runs only when one of its outputs is
+        needed and not stored. progress(stage, done, total) is called as each
+        stage finishes. Returns {'outputs', 'executed', 'cached', 'seconds',
+        'keys', 'total_seconds'}.
+        """
+        start = time.perf_counter()
+        keys = self.keys(source_keys)
+        targets = list(targets or self.order)
+        outputs = dict(sources)
+        execute, cached = set(), []
+
+        def require(name):
+            if name in outputs or name in execute:
+                return
+            stage = self.stages[name]
+            found, value = self.store.get(keys[name], persist=stage.persist)
+            if found:
+                outputs[name] = value
+                cached.append(name)
+                return
+            execute.add(name)
+            for dependency in stage.inputs:
+                require(dependency)
+
+        for target in targets:
+            require(target)
+
+        executed, seconds = [], {}
+        pending = [name for name in self.order if name in execute]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name in [n for n in pending if all(i in outputs for i in self.stages[n].inputs)]:
+                    pending.remove(name)
+                    running[pool.submit(self._execute, self.stages[name], outputs)] = name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        outputs[name], seconds[name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    self.store.put(keys[name], outputs[name], persist=self.stages[name].persist)
+                    executed.append(name)
+                    if progress is not None:
+                        progress(name, len(executed), len(execute))
+
+        return {
+            'outputs': {name: outputs[name] for name in targets},
+            'executed': executed,
+            'cached': cached,
+            'seconds': seconds,
+            'keys': {name: keys[name] for name in self.order},
+            'total_seconds': time.perf_counter() - start,
+        }
+
+    def _execute(self, stage, outputs):
+        start = time.perf_counter()
+        value = stage.func(*[outputs[i] for i in stage.inputs], **stage.params)
+        return value, time.perf_counter() - start
+
+
+CLASSIFIER_STATE = (
+    'dt_classifier', 'classification_features', 'accuracy', 'tuning_report', 'label_encoders', 'feature_medians',
+    'feature_profile',
+)
+# feature_medians travels with the classifier only, so the cluster output cannot overwrite it
+CLUSTER_STATE = ('kmeans_model', 'scaler', 'cluster_features', 'cluster_selection', 'cluster_counts')
+
+
+def _state(analyzer, names):
+    # Copied: the branches share one analyzer, and stored outputs must not change with it
+    return copy.deepcopy({name: getattr(analyzer, name) for name in names})
+
+
+def analysis_pipeline(analyzer, store=None, max_workers=None, tune=False, n_clusters=None,
+                      k_values=None, rule_params=None):
+    """
+    The analysis DAG over one StudentPerformanceAnalyzer
+    classify and cluster return the analyzer state they fitted, so cached
+    results can be restored with load_model_bundle. Clustering uses
+    n_clusters (default 3); with k_values and no n_clusters it selects k by
+    silhouette instead, which fits KMeans once per candidate (about 10s for
+    DEFAULT_K_VALUES on 20k rows, against well under a second for one k).
+    """
+    def classify(df, features, tune):
+        analyzer.adopt_feature_matrix(df, *features)
+        previous = analyzer.dt_classifier
+        if tune:
+            analyzer.tune_classification_model(df)
+        else:
+            analyzer.train_classification_model(df)
+        if analyzer.dt_classifier is previous:
+            raise ValueError('Classification failed')
+        return _state(analyzer, CLASSIFIER_STATE)
+
+    def cluster(df, features, n_clusters, k_values):
+        analyzer.adopt_feature_matrix(df, *features)
+        # perform_clustering adds a Cluster column; keep it off the frame the other branches read
+        labels = analyzer.perform_clustering(
+            df.copy(deep=False), n_clusters=n_clusters or 3, k_values=None if n_clusters or not k_values else k_values,
+        )
+        if labels is None:
+            raise ValueError('Clustering failed')
+        return {'model': _state(analyzer, CLUSTER_STATE), 'labels': labels}
+
+    def load(file_path):
+        df = analyzer.read_dataset(file_path)
+        if df.empty:
+            raise ValueError('Dataset is empty')
+        return df
+
+    return Pipeline([
+        Stage('load', load, inputs=['file_path'], persist=False),
+        Stage('clean', analyzer.clean_data, inputs=['load'],
+              version=f"{CACHE_FORMAT_VERSION}:{analyzer.performance_thresholds!r}"),
+        Stage('features', analyzer.feature_matrix_entry, inputs=['clean'], version=FEATURE_FORMAT_VERSION),
+        Stage('classify', classify, inputs=['clean', 'features'], params={'tune': tune}),
+        Stage('cluster', cluster, inputs=['clean', 'features'], params={'n_clusters': n_clusters, 'k_values': list(k_values or [])}),
+        Stage('rules', analyzer.generate_association_rules, inputs=['clean'], params=rule_params),
+    ], store=store, max_workers=max_workers)
+
+
+def run_analysis(file_path, analyzer=None, targets=ANALYSIS_TARGETS, progress=None, **options):
+    """
+    Run the analysis pipeline on a dataset file
+    Returns (analyzer, run): the analyzer holds the fitted classifier and
+    clusters whether they were trained or read from the store, and
+    run['outputs'] the output of each target. options go to analysis_pipeline.
+    """
+    analyzer = analyzer if analyzer is not None else StudentPerformanceAnalyzer()
+    pipeline = analysis_pipeline(analyzer, **options)
+    source_keys = {'file_path': file_content_hash(file_path)}
+    # Feature matrices are then cached under the cleaned dataset's key instead of a hash of the frame
+    analyzer.dataset_key = pipeline.keys(source_keys)['clean']
+
+    run = pipeline.run({'file_path': file_path}, source_keys, targets=targets, progress=progress)
+    # Restored as copies so later training on the analyzer leaves the stored outputs alone
+    if 'classify' in run['outputs']:
+        analyzer.load_model_bundle(copy.deepcopy(run['outputs']['classify']))
+    if 'cluster' in run['outputs']:
+        analyzer.load_model_bundle(copy.deepcopy(run['outputs']['cluster']['model']))
+    return analyzer, run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('file_path', help='CSV or Excel dataset')
+    parser.add_argument('--cache-dir', help='Keep stage outputs here between runs')
+    parser.add_argument('--workers', type=int, default=None, help='Stages run at once')
+    parser.add_argument('--tune', action='store_true', help='Grid-search the classifier')
+    parser.add_argument('--clusters', type=int, default=None, help='Fixed number of clusters')
+    parser.add_argument('--auto-k', action='store_true', help='Select the number of clusters by silhouette')
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore(DatasetCache(args.cache_dir) if args.cache_dir else None)
+    analyzer, run = run_analysis(
+        args.file_path, store=store, max_workers=args.workers, tune=args.tune, n_clusters=args.clusters,
+        k_values=DEFAULT_K_VALUES if args.auto_k else None,
+    )
+    for name in run['executed']:
+        print(f"{name:<10} executed {run['seconds'][name]:8.3f}s")
+    for name in run['cached']:
+        print(f"{name:<10} cached")
+    print(f"Accuracy {analyzer.accuracy:.3f}, {len(run['outputs']['rules'])} rules, "
+          f"{run['total_seconds']:.2f}s in total")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
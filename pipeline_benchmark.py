@@ -0,0 +1,201 @@
+"""
+End-to-end benchmark of StudentPerformanceAnalyzer on synthetic datasets
+Times and memory-profiles each pipeline stage at several dataset sizes,
+writes the results as JSON and compares them with a stored baseline.
+Run with: python -m analytics.pipeline_benchmark [--scales 1000 100000] [--baseline FILE]
+Exits with status 1 when a stage regressed beyond the tolerance.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from .ml_algorithms import StudentPerformanceAnalyzer
+from .synthetic_data import write_dataset
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+# A stage regresses when it is this much slower (or bigger) than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and the difference is above the noise floor
+MIN_SECONDS_DELTA = 0.05
+MIN_BYTES_DELTA = 1_000_000
+PREDICTION_SAMPLE = 1_000
+
+STAGES = (
+    'load_and_preprocess_data',
+    'train_classification_model',
+    'perform_clustering',
+    'generate_association_rules',
+    'predict_performance',
+)
+
+
+def _pipeline(file_path):
+    """The stages in order, as (name, callable) pairs sharing one analyzer"""
+    analyzer = StudentPerformanceAnalyzer()
+    state = {}
+
+    def load():
+        state['df'] = analyzer.load_and_preprocess_data(file_path)
+
+    def predict():
+        matrix, features = analyzer.build_feature_matrix(state['df'])
+        X = matrix[:PREDICTION_SAMPLE, [features.index(f) for f in analyzer.classification_features]]
+        for row in X:
+            analyzer.predict_performance(row)
+
+    return [
+        ('load_and_preprocess_data', load),
+        ('train_classification_model', lambda: analyzer.train_classification_model(state['df'])),
+        ('perform_clustering', lambda: analyzer.perform_clustering(state['df'])),
+        ('generate_association_rules', lambda: analyzer.generate_association_rules(state['df'])),
+        ('predict_performance', predict),
+    ]
+
+
+def _run_pipeline(file_path, trace_memory):
+    results = {}
+    for name, stage in _pipeline(file_path):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        # The analyzer reports progress with print; keep benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            stage()
+        seconds = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[name] = {'peak_bytes': peak}
+        else:
+            results[name] = {'seconds': seconds}
+    return results
+
+
+def benchmark_scale(n_rows, work_dir, repeat=1, memory=True, seed=42):
+    """
+    Time (best of repeat) and memory-profile every stage on n_rows students
+    Memory is measured in a separate run, because tracing allocations slows
+    the stages down.
+    """
+    file_path = os.path.join(work_dir, f"students_{n_rows}.csv")
+    write_dataset(file_path, n_rows, seed=seed)
+    try:
+        timings = [_run_pipeline(file_path, trace_memory=False) for _ in range(repeat)]
+        stages = {name: {'seconds': min(run[name]['seconds'] for run in timings)} for name in STAGES}
+        if memory:
+            for name, values in _run_pipeline(file_path, trace_memory=True).items():
+                stages[name].update(values)
+        stages['predict_performance']['calls'] = min(PREDICTION_SAMPLE, n_rows)
+    finally:
+        os.remove(file_path)
+    return stages
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=1, memory=True, seed=42):
+    """Benchmark every scale; returns a JSON-serialisable results dict"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        return {
+            'environment': environment(),
+            'scales': {
+                str(n_rows): benchmark_scale(n_rows, work_dir, repeat=repeat, memory=memory, seed=seed)
+                for n_rows in scales
+            },
+        }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Stages that got slower or bigger than the baseline, as a list of dicts"""
+    regressions = []
+    for scale, stages in results['scales'].items():
+        for stage, values in stages.items():
+            reference = baseline.get('scales', {}).get(scale, {}).get(stage)
+            if reference is None:
+                continue
+            for metric, floor in (('seconds', MIN_SECONDS_DELTA), ('peak_bytes', MIN_BYTES_DELTA)):
+                if metric not in values or metric not in reference:
+                    continue
+                current, previous = values[metric], reference[metric]
+                if current > previous * (1 + tolerance) and current - previous > floor:
+                    regressions.append({
+                        'scale': int(scale),
+                        'stage': stage,
+                        'metric': metric,
+                        'baseline': previous,
+                        'current': current,
+                        'change': current / previous - 1 if previous else float('inf'),
+                    })
+    return regressions
+
+
+def _format_row(scale, stage, values):
+    memory = f"{values['peak_bytes'] / 1e6:9.1f} MB" if 'peak_bytes' in values else ''
+    return f"{int(scale):>12,}  {stage:<28} {values['seconds']:9.3f}s {memory}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES), help='Dataset sizes in rows')
+    parser.add_argument('--repeat', type=int, default=1, help='Timing runs per scale (best is kept)')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the memory-profiling run')
+    parser.add_argument('--output', default='benchmark_results.json', help='Where to write the results')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline results to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='Allowed slowdown, e.g. 0.25 for 25%%')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the new baseline')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scales, repeat=args.repeat, memory=not args.no_memory)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for scale, stages in results['scales'].items():
+        for stage, values in stages.items():
+            print(_format_row(scale, stage, values))
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --update-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, tolerance=args.tolerance)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['stage']} at {regression['scale']:,} rows: {regression['metric']} "
+            f"{regression['baseline']:.3g} -> {regression['current']:.3g} ({regression['change']:+.0%})"
+        )
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
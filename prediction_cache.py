@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+DEFAULT_CACHE_SIZE = 10_000
+DEFAULT_CACHE_TTL_SECONDS = 300
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache with a time-to-live for single predictions
+    Keys are built by Predictor from the model version and the quantized
+    feature vector; the least recently used entry is dropped once max_size
+    is reached, and entries older than ttl_seconds are never returned.
+    """
+
+    def __init__(self, max_size=None, ttl_seconds=None):
+        self.max_size = max_size or getattr(settings, 'PREDICTION_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+        self.ttl_seconds = ttl_seconds or getattr(settings, 'PREDICTION_CACHE_TTL_SECONDS', DEFAULT_CACHE_TTL_SECONDS)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Cached value for key, or None on a miss or an expired entry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; called when a new model version is promoted"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """Return the process-wide prediction cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PredictionCache()
+    return _cache
@@ -0,0 +1,125 @@
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import Prediction, Student
+from .summaries import record_prediction_batch
+
+DEFAULT_BUFFER_SIZE = 500
+DEFAULT_FLUSH_SECONDS = 2.0
+# Rows kept for retry while the database is failing, as a multiple of the buffer size
+DEFAULT_RETRY_BUFFERS = 20
+# Keep roll_no IN (...) lookups under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 900
+
+
+class PredictionWriter:
+    """
+    Buffered writer that records predictions with bulk_create
+    Request threads only append to an in-memory buffer; a background thread
+    writes it out when it reaches max_size rows or every flush_seconds,
+    whichever comes first. Rows from a failed write go back to the front of
+    the buffer; past max_pending rows the oldest are dropped.
+    """
+
+    def __init__(self, max_size=None, flush_seconds=None):
+        self.max_size = max_size or getattr(settings, 'PREDICTION_BUFFER_SIZE', DEFAULT_BUFFER_SIZE)
+        self.flush_seconds = flush_seconds or getattr(settings, 'PREDICTION_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS)
+        self.max_pending = getattr(settings, 'PREDICTION_MAX_PENDING', self.max_size * DEFAULT_RETRY_BUFFERS)
+        self.dropped = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='prediction-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def record(self, predictions, model_version_id=None):
+        """Queue prediction dicts (as returned by Predictor) for writing"""
+        rows = [
+            (p.get('roll_no'), model_version_id, p['predicted_category'], p['confidence'], p.get('cluster'))
+            for p in predictions
+        ]
+        with self._lock:
+            self._buffer.extend(rows)
+            full = len(self._buffer) >= self.max_size
+        if full:
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_seconds)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing predictions: {e}")
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write everything buffered so far; returns the number of rows written"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            try:
+                self._write(rows)
+            except Exception:
+                self._requeue(rows)
+                raise
+            return len(rows)
+
+    def _write(self, rows):
+        roll_nos = list({roll_no for roll_no, *_ in rows if roll_no})
+        student_ids = {}
+        for i in range(0, len(roll_nos), LOOKUP_BATCH_SIZE):
+            batch = roll_nos[i:i + LOOKUP_BATCH_SIZE]
+            student_ids.update(Student.objects.filter(roll_no__in=batch).values_list('roll_no', 'pk'))
+
+        predictions = [
+            Prediction(
+                student_id=student_ids.get(roll_no),
+                model_version_id=model_version_id,
+                predicted_performance=category,
+                confidence_score=confidence,
+                cluster_group=cluster,
+            )
+            for roll_no, model_version_id, category, confidence, cluster in rows
+        ]
+        with transaction.atomic():
+            Prediction.objects.bulk_create(predictions, batch_size=self.max_size)
+            record_prediction_batch([(p.student_id, p.model_version_id, p.cluster_group) for p in predictions])
+
+    def _requeue(self, rows):
+        with self._lock:
+            self._buffer[:0] = rows
+            overflow = len(self._buffer) - self.max_pending
+            if overflow > 0:
+                del self._buffer[:overflow]
+                self.dropped += overflow
+        if overflow > 0:
+            print(f"Prediction buffer full, dropped {overflow} oldest predictions")
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_prediction_writer():
+    """Return the process-wide prediction writer, starting it on first use"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = PredictionWriter()
+    return _writer
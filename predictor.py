@@ -0,0 +1,196 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .data_loading import TRUE_VALUES
+from .ml_algorithms import FLAG_FEATURES, CATEGORICAL_FEATURES
+from .model_registry import get_active_model
+from .prediction_cache import get_prediction_cache
+
+# API payload keys -> dataset feature names
+FEATURE_ALIASES = {
+    'age': 'age',
+    'currentSemester': 'current_semester',
+    'attendance': 'attendance',
+    'creditsCompleted': 'credits_completed',
+    'currentCGPA': 'current_cgpa',
+    'previousSGPA': 'previous_sgpa',
+    'studyHours': 'study_hours',
+    'socialMediaHours': 'social_media_hours',
+    'skillDevelopmentHours': 'skill_development_hours',
+    'coCurricular': 'co_curricular',
+    'learningMode': 'learning_mode',
+}
+
+MAX_BATCH_SIZE = 100_000
+
+
+class Predictor:
+    """
+    Serving wrapper around one trained model version
+    Everything that does not depend on the request (feature order, fill
+    values, compiled tree, scaler and centroid arrays) is prepared once, so a
+    prediction is a small NumPy array plus a walk down the compiled tree.
+    """
+
+    def __init__(self, version, analyzer, cache=None):
+        self.version = version
+        self.cache = cache
+        self.classifier = analyzer.dt_classifier
+        self.classes = self.classifier.classes_ if self.classifier is not None else np.array([])
+        self.tree = analyzer.compiled_classifier() if self.classifier is not None else None
+
+        medians = analyzer.feature_medians
+        self.features = list(analyzer.classification_features)
+        self.feature_defaults = np.array([medians.get(f, 0.0) for f in self.features], dtype=np.float64)
+
+        self.cluster_features = list(analyzer.cluster_features)
+        self.cluster_defaults = np.array([medians.get(f, 0.0) for f in self.cluster_features], dtype=np.float64)
+        if analyzer.kmeans_model is not None:
+            self.scaler_mean = analyzer.scaler.mean_
+            self.scaler_scale = analyzer.scaler.scale_
+            self.centers = analyzer.kmeans_model.cluster_centers_
+        else:
+            self.centers = None
+
+        self.known_features = set(self.features) | set(self.cluster_features)
+
+        # Flag and categorical inputs are encoded exactly as in training
+        self.analyzer = analyzer
+        self.flag_features = self.known_features & set(FLAG_FEATURES)
+        self.category_codes = {
+            feature: {label: code for code, label in enumerate(analyzer.label_encoders[feature].classes_)}
+            for feature in self.known_features & set(CATEGORICAL_FEATURES)
+            if feature in analyzer.label_encoders
+        }
+
+    def _encode_value(self, name, value):
+        if name in self.flag_features:
+            return 1.0 if str(value).strip().lower() in TRUE_VALUES else 0.0
+        if name in self.category_codes:
+            return float(self.category_codes[name].get(str(value).strip(), -1))
+        return float(value)
+
+    def normalize_payload(self, data):
+        """Map API keys onto feature names, accepting either spelling; other keys are ignored"""
+        values = {}
+        for key, value in data.items():
+            name = FEATURE_ALIASES.get(key, key)
+            if name not in self.known_features or value is None or value == '':
+                continue
+            values[name] = self._encode_value(name, value)
+        return values
+
+    def _vector(self, values, features, defaults):
+        vector = defaults.copy()
+        for i, feature in enumerate(features):
+            if feature in values:
+                vector[i] = values[feature]
+        return vector
+
+    def _nearest_center(self, cluster_vector):
+        if self.centers is None:
+            return None
+        point = (cluster_vector - self.scaler_mean) / self.scaler_scale
+        return int(np.argmin(((self.centers - point) ** 2).sum(axis=1)))
+
+    def assign_cluster(self, values):
+        """Nearest k-means centroid in scaled space, computed without sklearn overhead"""
+        return self._nearest_center(self._vector(values, self.cluster_features, self.cluster_defaults))
+
+    def cache_key(self, vector, cluster_vector):
+        """Model version, classifier inputs quantized to tree intervals and exact cluster inputs
+
+        Inputs with equal keys get identical predictions. None if the inputs
+        cannot be cached (missing values).
+        """
+        path = self.tree.quantize(vector)
+        if path is None:
+            return None
+        return self.version.pk, path, tuple(cluster_vector.tolist())
+
+    def predict(self, data):
+        """Predict one student's performance category from an API payload"""
+        values = self.normalize_payload(data)
+        vector = self._vector(values, self.features, self.feature_defaults)
+        cluster_vector = self._vector(values, self.cluster_features, self.cluster_defaults)
+
+        key = self.cache_key(vector, cluster_vector) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        label, confidence = self.tree.predict_one(vector)
+        result = {
+            'predicted_category': str(label),
+            'confidence': float(confidence),
+            'cluster': self._nearest_center(cluster_vector),
+            'model_version': self.version.pk,
+        }
+        if key is not None:
+            self.cache.set(key, result)
+            return dict(result)
+        return result
+
+    def _matrix(self, frame, features, defaults):
+        """Feature matrix for a batch, filling missing columns/values with training medians"""
+        matrix = np.empty((len(frame), len(features)), dtype=np.float64)
+        for i, feature in enumerate(features):
+            if feature in frame.columns:
+                column = self.analyzer.encode_feature(feature, frame[feature]).astype(np.float64)
+                matrix[:, i] = np.where(np.isnan(column), defaults[i], column)
+            else:
+                matrix[:, i] = defaults[i]
+        return matrix
+
+    def assign_clusters(self, frame):
+        """Nearest centroid for every row of a batch"""
+        if self.centers is None:
+            return np.full(len(frame), None)
+        points = (self._matrix(frame, self.cluster_features, self.cluster_defaults) - self.scaler_mean) / self.scaler_scale
+        distances = ((points[:, np.newaxis, :] - self.centers[np.newaxis, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    def predict_batch(self, frame):
+        """Predict a whole cohort at once from a DataFrame of students"""
+        frame = frame.rename(columns=FEATURE_ALIASES)
+        matrix = self._matrix(frame, self.features, self.feature_defaults)
+
+        labels, confidences = self.tree.predict(matrix)
+        clusters = self.assign_clusters(frame)
+
+        if 'roll_no' in frame.columns:
+            roll_nos = [str(r) if pd.notna(r) else None for r in frame['roll_no'].tolist()]
+        else:
+            roll_nos = [None] * len(frame)
+        return [
+            {
+                'roll_no': roll_no,
+                'predicted_category': str(label),
+                'confidence': float(confidence),
+                'cluster': int(cluster) if cluster is not None else None,
+            }
+            for roll_no, label, confidence, cluster in zip(roll_nos, labels, confidences, clusters)
+        ]
+
+
+_predictor = None
+_predictor_lock = threading.Lock()
+
+
+def get_predictor():
+    """Return the shared Predictor for the active model version, or None if there is none"""
+    global _predictor
+    version, analyzer = get_active_model()
+    if version is None or analyzer.dt_classifier is None:
+        return None
+
+    predictor = _predictor
+    if predictor is None or predictor.version.pk != version.pk:
+        with _predictor_lock:
+            if _predictor is None or _predictor.version.pk != version.pk:
+                _predictor = Predictor(version, analyzer, cache=get_prediction_cache())
+            predictor = _predictor
+    return predictor
@@ -18,6 +18,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'analytics.monitoring.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -31,7 +32,7 @@ ROOT_URLCONF = 'student_analytics.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'analytics.monitoring.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -51,6 +52,18 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Background jobs write concurrently; wait for SQLite's lock instead of failing
+        'OPTIONS': {'timeout': 20},
+    }
+}
+
+# Dashboard aggregates are cached here. Use a shared backend (Redis, Memcached or
+# the database cache) when running several worker processes so that cache
+# invalidation after an upload or retrain reaches all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'student-analytics',
     }
 }
 
@@ -81,4 +94,43 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Background jobs (uploads, model training) run on an in-process thread pool.
+# SQLite allows a single writer, so keep this at 1 unless using PostgreSQL/MySQL.
+ANALYTICS_JOB_WORKERS = 1
+# Running jobs send a heartbeat this often; a job whose heartbeat is older
+# than ANALYTICS_JOB_STALE_SECONDS is failed as interrupted
+ANALYTICS_JOB_HEARTBEAT_SECONDS = 10
+ANALYTICS_JOB_STALE_SECONDS = 120
+
+# Predictions are buffered and written in bulk once either threshold is reached
+PREDICTION_BUFFER_SIZE = 500
+PREDICTION_FLUSH_SECONDS = 2.0
+
+# Single predictions are cached per process, keyed on model version and inputs
+PREDICTION_CACHE_SIZE = 10000
+PREDICTION_CACHE_TTL_SECONDS = 300
+
+# Prometheus metrics are served at /metrics/ to these addresses only
+ANALYTICS_METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Opt-in sampling profiler: requests slower than the threshold are written
+# to ANALYTICS_PROFILE_DIR as folded stacks (flamegraph.pl / speedscope)
+ANALYTICS_PROFILER_ENABLED = False
+ANALYTICS_PROFILE_SLOW_SECONDS = 1.0
+ANALYTICS_PROFILE_INTERVAL = 0.005
+ANALYTICS_PROFILE_DIR = BASE_DIR / 'media' / 'profiles'
+
+# Training jobs append one JSON line per analyzer stage here when set;
+# tracing allocations with tracemalloc slows the stages down noticeably
+ANALYTICS_TRACE_FILE = None
+ANALYTICS_TRACE_MEMORY = False
+
+# Analysis pipeline outputs are kept in memory per process; set a directory
+# to keep them on disk so unchanged stages are skipped after a restart too
+ANALYTICS_PIPELINE_CACHE_DIR = None
+
+# update_models retrains the decision tree only when an input's Population
+# Stability Index between training data and new records exceeds this
+ANALYTICS_DRIFT_THRESHOLD = 0.2
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -0,0 +1,250 @@
+import pandas as pd
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+
+from .models import (
+    Student, AcademicRecord, Prediction,
+    PerformanceSummary, ClusterSummary, ClusterMembership, AnalyticsCounter,
+)
+
+STUDENTS_COUNTER = 'students'
+PREDICTIONS_COUNTER = 'predictions'
+
+# Keep student_id IN (...) lookups under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 900
+REBUILD_CHUNK_SIZE = 10_000
+
+
+def increment_counter(name, amount):
+    if not amount:
+        return
+    AnalyticsCounter.objects.get_or_create(name=name)
+    AnalyticsCounter.objects.filter(name=name).update(value=F('value') + amount)
+
+
+def get_counter(name):
+    return AnalyticsCounter.objects.filter(name=name).values_list('value', flat=True).first() or 0
+
+
+def _apply_increments(model, key_fields, totals):
+    """Add per-group totals to summary rows, creating missing rows first
+
+    totals is a DataFrame with the key columns plus one column per summed field.
+    """
+    if totals.empty:
+        return
+
+    value_fields = [c for c in totals.columns if c not in key_fields]
+    keys = totals[key_fields].to_dict('records')
+    model.objects.bulk_create([model(**key) for key in keys], ignore_conflicts=True)
+
+    for key, values in zip(keys, totals[value_fields].to_dict('records')):
+        model.objects.filter(**key).update(
+            **{field: F(field) + value for field, value in values.items()}
+        )
+
+
+def record_academic_batch(records):
+    """Fold newly created AcademicRecord rows into PerformanceSummary
+
+    records is a DataFrame with semester, admission_year, performance_category,
+    current_cgpa, attendance and credits_completed columns.
+    """
+    key_fields = ['semester', 'admission_year', 'performance_category']
+    totals = (
+        records.groupby(key_fields, observed=True)
+        .agg(
+            record_count=('current_cgpa', 'size'),
+            cgpa_sum=('current_cgpa', 'sum'),
+            attendance_sum=('attendance', 'sum'),
+            credits_sum=('credits_completed', 'sum'),
+        )
+        .reset_index()
+    )
+    totals[['semester', 'admission_year']] = totals[['semester', 'admission_year']].astype(int)
+    totals['record_count'] = totals['record_count'].astype(int)
+    _apply_increments(PerformanceSummary, key_fields, totals)
+
+
+def record_prediction_batch(rows):
+    """Fold newly written predictions into ClusterSummary and the predictions counter
+
+    rows is a list of (student_id, model_version_id, cluster_group) tuples in
+    the order they were written. A student counts once per model version: a
+    later prediction takes back what their earlier one added and adds their
+    current values under the new cluster.
+    """
+    increment_counter(PREDICTIONS_COUNTER, len(rows))
+
+    scored = pd.DataFrame(
+        [row for row in rows if row[0] is not None and row[1] is not None and row[2] is not None],
+        columns=['student_id', 'model_version_id', 'cluster_group'],
+    ).drop_duplicates(['model_version_id', 'student_id'], keep='last')
+    if scored.empty:
+        return
+
+    # Attach each student's most recent CGPA and attendance
+    student_ids = scored['student_id'].unique().tolist()
+    records = []
+    for i in range(0, len(student_ids), LOOKUP_BATCH_SIZE):
+        records.extend(
+            AcademicRecord.objects.filter(student_id__in=student_ids[i:i + LOOKUP_BATCH_SIZE])
+            .values_list('pk', 'student_id', 'current_cgpa', 'attendance')
+        )
+    latest = (
+        pd.DataFrame(records, columns=['pk', 'student_id', 'cgpa', 'attendance'])
+        .sort_values('pk')
+        .drop_duplicates('student_id', keep='last')
+        .drop(columns='pk')
+    )
+    scored = scored.merge(latest, on='student_id', how='inner')
+    if scored.empty:
+        return
+
+    previous = _memberships(scored)
+    ClusterMembership.objects.bulk_create(
+        [
+            ClusterMembership(
+                model_version_id=row.model_version_id,
+                student_id=row.student_id,
+                cluster_group=row.cluster_group,
+                cgpa=row.cgpa,
+                attendance=row.attendance,
+            )
+            for row in scored.itertuples(index=False)
+        ],
+        update_conflicts=True,
+        unique_fields=['model_version', 'student'],
+        update_fields=['cluster_group', 'cgpa', 'attendance'],
+    )
+
+    key_fields = ['model_version_id', 'cluster_group']
+    changes = pd.concat([
+        scored.assign(student_count=1),
+        previous.assign(student_count=-1, cgpa=-previous['cgpa'], attendance=-previous['attendance']),
+    ])
+    totals = (
+        changes.groupby(key_fields)
+        .agg(
+            student_count=('student_count', 'sum'),
+            cgpa_sum=('cgpa', 'sum'),
+            attendance_sum=('attendance', 'sum'),
+        )
+        .reset_index()
+        .astype({'model_version_id': int, 'cluster_group': int, 'student_count': int})
+    )
+    # Students rescored into the same cluster with the same record change nothing
+    changed = (totals[['student_count', 'cgpa_sum', 'attendance_sum']] != 0).any(axis=1)
+    _apply_increments(ClusterSummary, key_fields, totals[changed])
+
+
+def _memberships(scored):
+    """Existing ClusterMembership rows for the (model_version_id, student_id) pairs in scored"""
+    rows = []
+    for version_id, group in scored.groupby('model_version_id'):
+        student_ids = group['student_id'].tolist()
+        for i in range(0, len(student_ids), LOOKUP_BATCH_SIZE):
+            rows.extend(
+                ClusterMembership.objects
+                .filter(model_version_id=version_id, student_id__in=student_ids[i:i + LOOKUP_BATCH_SIZE])
+                .values_list('model_version_id', 'student_id', 'cluster_group', 'cgpa', 'attendance')
+            )
+    return pd.DataFrame(rows, columns=['model_version_id', 'student_id', 'cluster_group', 'cgpa', 'attendance'])
+
+
+def carry_forward_cluster_summaries(source_version_id, target_version_id):
+    """Start a model version's cluster summaries from another version's
+
+    For versions that only move their predecessor's centres online, so cluster
+    statistics keep covering students scored before the update. Memberships
+    are copied as well, so a student scored again under the target version
+    leaves the cluster they were carried into. A rebuild recomputes them from
+    the target version's own predictions only.
+    """
+    ClusterSummary.objects.bulk_create(
+        [
+            ClusterSummary(
+                model_version_id=target_version_id,
+                cluster_group=summary.cluster_group,
+                student_count=summary.student_count,
+                cgpa_sum=summary.cgpa_sum,
+                attendance_sum=summary.attendance_sum,
+            )
+            for summary in ClusterSummary.objects.filter(model_version_id=source_version_id)
+        ],
+        ignore_conflicts=True,
+    )
+
+    memberships = (
+        ClusterMembership.objects.filter(model_version_id=source_version_id)
+        .values_list('student_id', 'cluster_group', 'cgpa', 'attendance')
+        .iterator(chunk_size=REBUILD_CHUNK_SIZE)
+    )
+    chunk = []
+    for student_id, cluster_group, cgpa, attendance in memberships:
+        chunk.append(ClusterMembership(
+            model_version_id=target_version_id,
+            student_id=student_id,
+            cluster_group=cluster_group,
+            cgpa=cgpa,
+            attendance=attendance,
+        ))
+        if len(chunk) >= REBUILD_CHUNK_SIZE:
+            ClusterMembership.objects.bulk_create(chunk, ignore_conflicts=True)
+            chunk = []
+    if chunk:
+        ClusterMembership.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+@transaction.atomic
+def rebuild_summaries():
+    """Recompute every summary table from the fact tables"""
+    PerformanceSummary.objects.all().delete()
+    ClusterSummary.objects.all().delete()
+    ClusterMembership.objects.all().delete()
+    AnalyticsCounter.objects.all().delete()
+
+    performance = (
+        AcademicRecord.objects
+        .annotate(record_semester=Coalesce('semester', 'student__current_semester'))
+        .values('record_semester', 'student__admission_year', 'performance_category')
+        .annotate(
+            record_count=Count('id'),
+            cgpa_sum=Sum('current_cgpa'),
+            attendance_sum=Sum('attendance'),
+            credits_sum=Sum('credits_completed'),
+        )
+        .order_by()
+    )
+    PerformanceSummary.objects.bulk_create([
+        PerformanceSummary(
+            semester=row['record_semester'],
+            admission_year=row['student__admission_year'],
+            performance_category=row['performance_category'],
+            record_count=row['record_count'],
+            cgpa_sum=row['cgpa_sum'] or 0.0,
+            attendance_sum=row['attendance_sum'] or 0.0,
+            credits_sum=row['credits_sum'] or 0.0,
+        )
+        for row in performance
+    ])
+
+    predictions = (
+        Prediction.objects.filter(student__isnull=False, model_version__isnull=False, cluster_group__isnull=False)
+        .order_by('pk')
+        .values_list('student_id', 'model_version_id', 'cluster_group')
+        .iterator(chunk_size=REBUILD_CHUNK_SIZE)
+    )
+    chunk = []
+    for row in predictions:
+        chunk.append(row)
+        if len(chunk) >= REBUILD_CHUNK_SIZE:
+            record_prediction_batch(chunk)
+            chunk = []
+    if chunk:
+        record_prediction_batch(chunk)
+
+    # Counters are set absolutely, overriding the increments made above
+    AnalyticsCounter.objects.update_or_create(name=STUDENTS_COUNTER, defaults={'value': Student.objects.count()})
+    AnalyticsCounter.objects.update_or_create(name=PREDICTIONS_COUNTER, defaults={'value': Prediction.objects.count()})
@@ -0,0 +1,101 @@
+"""
+Synthetic student datasets for benchmarks and load testing
+Generates every column StudentPerformanceAnalyzer and the analytics models read,
+with CGPA driven by attendance, study habits and co-curricular activity so the
+classifier, clustering and rule mining have structure to find.
+Run with: python -m analytics.synthetic_data <rows> <output.csv>
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .data_loading import STUDENT_DTYPES
+
+# Rows generated and written at a time by write_dataset
+GENERATION_CHUNK_SIZE = 500_000
+# Share of values blanked in columns that are often missing in real uploads
+DEFAULT_MISSING_RATE = 0.01
+MISSING_COLUMNS = ('attendance', 'study_hours', 'social_media_hours', 'family_income')
+
+LEARNING_MODES = ['Offline', 'Hybrid', 'Online']
+SKILLS = ['Python', 'Java', 'Web Development', 'Data Analysis', 'Design', 'Communication']
+INTEREST_AREAS = ['AI/ML', 'Web Development', 'Cybersecurity', 'Data Science', 'Cloud', 'Management']
+
+
+def _yes_no(flags):
+    return np.where(flags, 'Yes', 'No')
+
+
+def generate_students(n_rows, seed=42, start=0, missing_rate=DEFAULT_MISSING_RATE):
+    """
+    One frame of synthetic students
+    Roll numbers run from start, so frames generated with consecutive start
+    values can be concatenated without duplicates.
+    """
+    rng = np.random.default_rng([seed, start])
+    ids = np.arange(start, start + n_rows)
+
+    semester = rng.integers(1, 9, n_rows)
+    attendance = np.clip(rng.normal(78, 12, n_rows), 30, 100).round(1)
+    study_hours = np.clip(rng.gamma(2.0, 1.5, n_rows), 0, 12).round(1)
+    social_media_hours = np.clip(rng.gamma(2.0, 1.2, n_rows), 0, 10).round(1)
+    skill_hours = np.clip(rng.gamma(1.5, 1.0, n_rows), 0, 8).round(1)
+    co_curricular = rng.random(n_rows) < 0.45
+
+    ability = (
+        0.025 * (attendance - 78)
+        + 0.10 * (study_hours - 3)
+        - 0.08 * (social_media_hours - 2.4)
+        + 0.10 * co_curricular
+        + rng.normal(0, 0.45, n_rows)
+    )
+    cgpa = np.clip(2.9 + ability, 0, 4).round(2)
+    probation = cgpa < 2.0
+
+    df = pd.DataFrame({
+        'roll_no': pd.Series(ids).map('R{:08d}'.format),
+        'name': pd.Series(ids).map('Student {}'.format),
+        'gender': rng.choice(['Male', 'Female', 'Other'], n_rows, p=[0.52, 0.46, 0.02]),
+        'age': 17 + (semester + 1) // 2 + rng.integers(0, 3, n_rows),
+        'admission_year': 2024 - (semester - 1) // 2,
+        'current_semester': semester,
+        'current_cgpa': cgpa,
+        'previous_sgpa': np.clip(cgpa + rng.normal(0, 0.25, n_rows), 0, 4).round(2),
+        'credits_completed': np.maximum(semester * 20 - rng.integers(0, 15, n_rows), 0),
+        'attendance': attendance,
+        'scholarship': _yes_no((cgpa >= 3.4) & (rng.random(n_rows) < 0.6)),
+        'probation': _yes_no(probation),
+        'suspension': _yes_no(probation & (rng.random(n_rows) < 0.05)),
+        'study_hours': study_hours,
+        'study_sessions': rng.integers(1, 8, n_rows),
+        'learning_mode': rng.choice(LEARNING_MODES, n_rows, p=[0.5, 0.3, 0.2]),
+        'social_media_hours': social_media_hours,
+        'skill_development_hours': skill_hours,
+        'skills': rng.choice(SKILLS, n_rows),
+        'interest_area': rng.choice(INTEREST_AREAS, n_rows),
+        'co_curricular': _yes_no(co_curricular),
+        'family_income': rng.lognormal(np.log(500_000), 0.6, n_rows).round(-3),
+    })
+
+    for column in MISSING_COLUMNS:
+        df[column] = df[column].where(rng.random(n_rows) >= missing_rate)
+
+    return df[list(STUDENT_DTYPES)]
+
+
+def write_dataset(file_path, n_rows, seed=42, chunk_size=GENERATION_CHUNK_SIZE, missing_rate=DEFAULT_MISSING_RATE):
+    """Write n_rows synthetic students to a CSV file, chunk by chunk so memory stays bounded"""
+    for start in range(0, n_rows, chunk_size):
+        chunk = generate_students(min(chunk_size, n_rows - start), seed=seed, start=start, missing_rate=missing_rate)
+        chunk.to_csv(file_path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return file_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m analytics.synthetic_data <rows> <output.csv>")
+        sys.exit(1)
+    rows = int(sys.argv[1].replace('_', ''))
+    write_dataset(sys.argv[2], rows)
+    print(f"Wrote {rows:,} students to {sys.argv[2]}")
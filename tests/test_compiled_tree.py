@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from ..compiled_tree import CompiledTree
+
+TREES = 20
+CLASSES = np.array(['Distinction', 'First Class', 'Pass'])
+
+
+def _fitted_tree(seed, rows=400, features=5, missing_rate=0.05):
+    """A random tree trained on data with missing values, and rows to score with it"""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows * 2, features))
+    score = X[:, 0] - 0.7 * X[:, 1] + 0.4 * X[:, 2] * X[:, 3] + rng.normal(0, 0.5, rows * 2)
+    y = CLASSES[np.digitize(score, [-0.5, 0.5])]
+    X[rng.random(X.shape) < missing_rate] = np.nan
+
+    classifier = DecisionTreeClassifier(
+        random_state=seed,
+        max_depth=int(rng.integers(2, 12)),
+        min_samples_leaf=int(rng.integers(1, 20)),
+        criterion=str(rng.choice(['gini', 'entropy'])),
+    ).fit(X[:rows], y[:rows])
+    return classifier, X[rows:]
+
+
+class CompiledTreeTests(unittest.TestCase):
+    """CompiledTree answers exactly like the DecisionTreeClassifier it was built from"""
+
+    def test_matches_sklearn(self):
+        for seed in range(TREES):
+            with self.subTest(seed=seed):
+                classifier, X = _fitted_tree(seed)
+                tree = CompiledTree(classifier)
+                expected = classifier.predict_proba(X)
+
+                np.testing.assert_array_equal(tree.predict_proba(X), expected)
+                np.testing.assert_array_equal(tree.apply_flat(X), classifier.apply(X))
+                np.testing.assert_array_equal(tree.apply(X), classifier.apply(X))
+                labels, confidences = tree.predict(X)
+                np.testing.assert_array_equal(labels, classifier.predict(X))
+                np.testing.assert_array_equal(confidences, expected.max(axis=1))
+
+                for row, probabilities in zip(X, expected):
+                    label, confidence = tree.predict_one(row)
+                    self.assertEqual(label, classifier.classes_[probabilities.argmax()])
+                    self.assertEqual(confidence, probabilities.max())
+                    np.testing.assert_array_equal(tree.predict_proba_one(row), probabilities)
+
+    def test_quantize_key_determines_leaf(self):
+        classifier, X = _fitted_tree(0, missing_rate=0.0)
+        tree = CompiledTree(classifier)
+        leaves = {}
+        for row in X:
+            key = tree.quantize(row)
+            self.assertEqual(leaves.setdefault(key, tree.leaf(row)), tree.leaf(row))
+        self.assertIsNone(tree.quantize(np.full(X.shape[1], np.nan)))
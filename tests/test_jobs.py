@@ -0,0 +1,73 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from ..jobs import JobQueue, register_job
+from ..models import Job
+
+calls = []
+
+
+@register_job('test_record_call')
+def record_call_job(job, report_progress):
+    calls.append(job.pk)
+    return {'calls': len(calls)}
+
+
+@register_job('test_failed_as_stale')
+def failed_as_stale_job(job, report_progress):
+    # Another process's recovery gives up on the job while it is still running here
+    Job.objects.filter(pk=job.pk).update(status='failed', error='Interrupted: its worker stopped responding')
+    return {'finished': True}
+
+
+class JobQueueTests(TransactionTestCase):
+    """Claiming, stale-job recovery and late workers"""
+
+    def setUp(self):
+        calls.clear()
+        self.queue = JobQueue(max_workers=1)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_job_runs_once(self):
+        job = Job.objects.create(kind='test_record_call')
+        self.queue._run(job.pk)
+        self.queue._run(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(calls, [job.pk])
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.worker, self.queue.worker)
+        self.assertIsNotNone(job.heartbeat_at)
+
+    def test_recovery_fails_only_stale_jobs(self):
+        now = timezone.now()
+        old = now - timedelta(seconds=self.queue.stale_seconds + 60)
+        stale = Job.objects.create(kind='test_record_call', status='running', worker='gone:1',
+                                   started_at=old, heartbeat_at=old)
+        live = Job.objects.create(kind='test_record_call', status='running', worker='other:2',
+                                  started_at=old, heartbeat_at=now)
+        no_heartbeat = Job.objects.create(kind='test_record_call', status='running', started_at=old)
+        queued = Job.objects.create(kind='test_record_call')
+
+        with mock.patch.object(self.queue, '_submit') as submit:
+            self.queue.recover_interrupted_jobs()
+
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[stale.pk], 'failed')
+        self.assertEqual(statuses[no_heartbeat.pk], 'failed')
+        self.assertEqual(statuses[live.pk], 'running')
+        submit.assert_called_once_with(queued.pk)
+
+    def test_late_worker_keeps_stale_failure(self):
+        job = Job.objects.create(kind='test_failed_as_stale')
+        self.queue._run(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNone(job.result)
+        self.assertIn('stopped responding', job.error)
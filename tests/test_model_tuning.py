@@ -0,0 +1,38 @@
+import unittest
+
+import numpy as np
+
+from ..model_tuning import grid_search, select_k
+
+PARAM_GRID = {'max_depth': [2, 4, None], 'min_samples_leaf': [1, 10]}
+
+
+def _dataset(rows=300, features=4, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features)).astype(np.float32)
+    y = np.where(X[:, 0] + 0.5 * X[:, 1] + rng.normal(0, 0.5, rows) > 0, 'Good', 'Poor')
+    return X, y
+
+
+class ParallelSearchTests(unittest.TestCase):
+    """The process pool over shared memory scores exactly like the serial path"""
+
+    def test_grid_search_matches_serial(self):
+        X, y = _dataset()
+        serial = grid_search(X, y, param_grid=PARAM_GRID, n_folds=3, n_jobs=1)
+        parallel = grid_search(X, y, param_grid=PARAM_GRID, n_folds=3, n_jobs=2)
+
+        def scores(search):
+            return {(repr(r['params']), r['columns']): r['cv_accuracy'] for r in search['results']}
+
+        self.assertEqual(parallel['n_jobs'], 2)
+        self.assertEqual(serial['candidates'], parallel['candidates'])
+        self.assertEqual(scores(parallel), scores(serial))
+
+    def test_select_k_matches_serial(self):
+        X, _ = _dataset(rows=200, features=2)
+        serial = select_k(X, k_values=[2, 3, 4], n_jobs=1)
+        parallel = select_k(X, k_values=[2, 3, 4], n_jobs=2)
+
+        self.assertEqual(parallel['k'], serial['k'])
+        self.assertEqual(parallel['diagnostics'], serial['diagnostics'])
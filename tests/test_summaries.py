@@ -0,0 +1,90 @@
+from django.test import TestCase
+
+from ..models import AcademicRecord, ClusterSummary, ModelVersion, Prediction, Student
+from ..summaries import (
+    PREDICTIONS_COUNTER, carry_forward_cluster_summaries, get_counter, rebuild_summaries, record_prediction_batch,
+)
+
+STUDENTS = 40
+
+
+def _add_record(student, cgpa, attendance):
+    return AcademicRecord.objects.create(
+        student=student, current_cgpa=cgpa, previous_sgpa=cgpa, credits_completed=60, attendance=attendance,
+        performance_category='Good', semester=student.current_semester,
+    )
+
+
+def _score(version, clusters):
+    """Write predictions as PredictionWriter does; clusters maps student -> cluster_group"""
+    predictions = Prediction.objects.bulk_create([
+        Prediction(
+            student=student, model_version=version, predicted_performance='Good', confidence_score=0.9,
+            cluster_group=cluster,
+        )
+        for student, cluster in clusters.items()
+    ])
+    record_prediction_batch([(p.student_id, p.model_version_id, p.cluster_group) for p in predictions])
+
+
+def _cluster_totals():
+    return {
+        (summary.model_version_id, summary.cluster_group): (
+            summary.student_count, round(summary.cgpa_sum, 6), round(summary.attendance_sum, 6),
+        )
+        for summary in ClusterSummary.objects.filter(student_count__gt=0)
+    }
+
+
+class ClusterSummaryTests(TestCase):
+    """Incremental cluster accounting counts each student once per model version"""
+
+    def setUp(self):
+        self.students = []
+        for i in range(STUDENTS):
+            student = Student.objects.create(
+                roll_no=f"R{i:04d}", name=f"Student {i}", gender='Male', age=20, admission_year=2023,
+                current_semester=3,
+            )
+            _add_record(student, 2.0 + (i % 20) / 10, 60 + i % 40)
+            self.students.append(student)
+        self.v1 = ModelVersion.objects.create(artifact_path='v1.pkl')
+        self.v2 = ModelVersion.objects.create(artifact_path='v2.pkl')
+
+    def test_rescoring_matches_rebuild(self):
+        _score(self.v1, {student: i % 3 for i, student in enumerate(self.students)})
+
+        # Half the cohort gets a new record and is rescored into other clusters
+        rescored = self.students[::2]
+        for student in rescored[:10]:
+            _add_record(student, 3.9, 99)
+        _score(self.v1, {student: (i + 1) % 3 for i, student in enumerate(rescored)})
+        _score(self.v2, {student: i % 2 for i, student in enumerate(self.students[:15])})
+        _score(self.v2, {student: 1 for student in self.students[:5]})
+
+        incremental = _cluster_totals()
+        predictions = get_counter(PREDICTIONS_COUNTER)
+        sizes = {self.v1.pk: 0, self.v2.pk: 0}
+        for (version, _), (count, _, _) in incremental.items():
+            sizes[version] += count
+        self.assertEqual(sizes, {self.v1.pk: STUDENTS, self.v2.pk: 15})
+
+        rebuild_summaries()
+        self.assertEqual(_cluster_totals(), incremental)
+        self.assertEqual(get_counter(PREDICTIONS_COUNTER), predictions)
+
+    def test_carried_forward_students_move_when_rescored(self):
+        _score(self.v1, {student: i % 3 for i, student in enumerate(self.students)})
+        carry_forward_cluster_summaries(self.v1.pk, self.v2.pk)
+
+        updated = self.students[:12]
+        for student in updated:
+            _add_record(student, 1.5, 50)
+        _score(self.v2, {student: 0 for student in updated})
+
+        # Every student once, with the values of their latest record
+        summaries = ClusterSummary.objects.filter(model_version=self.v2)
+        latest = {record.student_id: record for record in AcademicRecord.objects.order_by('pk')}
+        self.assertEqual(sum(s.student_count for s in summaries), STUDENTS)
+        self.assertAlmostEqual(sum(s.cgpa_sum for s in summaries), sum(r.current_cgpa for r in latest.values()))
+        self.assertAlmostEqual(sum(s.attendance_sum for s in summaries), sum(r.attendance for r in latest.values()))
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from ..data_loading import STUDENT_DTYPES
+from ..ml_algorithms import CLASSIFICATION_FEATURES, CLUSTER_FEATURES, StudentPerformanceAnalyzer
+from ..synthetic_data import MISSING_COLUMNS, generate_students, write_dataset
+
+ROWS = 1_000
+FLAG_COLUMNS = ('scholarship', 'probation', 'suspension', 'co_curricular')
+
+
+class GenerateStudentsTests(unittest.TestCase):
+    """The synthetic cohort has the layout StudentPerformanceAnalyzer reads"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = generate_students(ROWS)
+
+    def test_shape_and_columns(self):
+        self.assertEqual(self.df.shape, (ROWS, len(STUDENT_DTYPES)))
+        self.assertEqual(list(self.df.columns), list(STUDENT_DTYPES))
+        self.assertTrue(self.df['roll_no'].is_unique)
+
+    def test_dtypes(self):
+        for column, dtype in STUDENT_DTYPES.items():
+            if dtype == 'float64':
+                self.assertTrue(pd.api.types.is_numeric_dtype(self.df[column]), column)
+            else:
+                self.assertTrue(
+                    pd.api.types.is_object_dtype(self.df[column]) or pd.api.types.is_string_dtype(self.df[column]),
+                    column,
+                )
+
+    def test_values(self):
+        for column in FLAG_COLUMNS:
+            self.assertTrue(set(self.df[column]) <= {'Yes', 'No'}, column)
+        self.assertTrue(self.df['current_cgpa'].between(0, 4).all())
+        self.assertTrue(self.df['attendance'].dropna().between(0, 100).all())
+        for column in MISSING_COLUMNS:
+            self.assertTrue(0 < self.df[column].isna().sum() < ROWS, column)
+
+    def test_seeded(self):
+        pd.testing.assert_frame_equal(generate_students(ROWS), self.df)
+        self.assertFalse(generate_students(10, start=ROWS)['roll_no'].isin(self.df['roll_no']).any())
+
+    def test_analyzer_reads_written_dataset(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_dataset(os.path.join(tmp, 'students.csv'), ROWS, chunk_size=400)
+            analyzer = StudentPerformanceAnalyzer()
+            df = analyzer.clean_data(analyzer.read_dataset(path))
+
+        self.assertEqual(len(df), ROWS)
+        self.assertIn('Performance_Category', df.columns)
+        self.assertTrue(set(CLASSIFICATION_FEATURES + CLUSTER_FEATURES) <= set(df.columns))
+
+        matrix, features = analyzer.build_feature_matrix(df)
+        self.assertEqual(matrix.shape, (ROWS, len(features)))
+        self.assertEqual(matrix.dtype, np.float32)
+        self.assertFalse(np.isnan(matrix).any())
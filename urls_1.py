@@ -8,6 +8,10 @@ urlpatterns = [
     path('dashboard/', views.dashboard, name='dashboard'),
     path('upload/', views.upload_data, name='upload_data'),
     path('api/predict/', views.predict_performance, name='predict_performance'),
+    path('api/predict/batch/', views.predict_performance_batch, name='predict_performance_batch'),
+    path('api/predict/cache/', views.prediction_cache_stats, name='prediction_cache_stats'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('api/jobs/<int:job_id>/', views.job_status, name='job_status'),
     path('association-rules/', views.association_rules, name='association_rules'),
     path('clustering/', views.clustering_results, name='clustering_results'),
 ]
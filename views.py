@@ -1,52 +1,39 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import pandas as pd
 import numpy as np
 from django.contrib import messages
-from .models import Student, AcademicRecord, StudentBehavior, Prediction
+from django.conf import settings
+from .models import Student, AcademicRecord, StudentBehavior, Prediction, Job
+from .jobs import get_job_queue
+from . import aggregates
+from .predictor import get_predictor, MAX_BATCH_SIZE
+from .prediction_writer import get_prediction_writer
+from .prediction_cache import get_prediction_cache
+from .monitoring import render_metrics
+import io
 import json
 import os
+import uuid
 
 def home(request):
     """Home page with dashboard overview"""
     context = {
-        'total_students': 1194,
-        'total_predictions': 145,
-        'avg_cgpa': 3.17,
-        'classification_accuracy': 43.1,
-        'performance_distribution': {
-            'Distinction': 438,
-            'First Class': 406, 
-            'Second Class': 259,
-            'Pass': 91
-        }
+        **aggregates.overview_stats(),
+        'performance_distribution': aggregates.performance_distribution(),
     }
     return render(request, 'analytics/home.html', context)
 
 def dashboard(request):
     """Main analytics dashboard"""
     context = {
-        'students_count': 1194,
-        'performance_distribution': {
-            'Distinction': 438,
-            'First Class': 406,
-            'Second Class': 259,
-            'Pass': 91
-        },
-        'clusters': [
-            {'name': 'High Performers', 'count': 551, 'avg_cgpa': 3.36},
-            {'name': 'Average Performers', 'count': 596, 'avg_cgpa': 3.22},
-            {'name': 'Low Performers', 'count': 47, 'avg_cgpa': 0.21},
-        ],
-        'feature_importance': [
-            {'feature': 'Credits Completed', 'importance': 29.1},
-            {'feature': 'Family Income', 'importance': 13.3},
-            {'feature': 'Attendance', 'importance': 13.2},
-            {'feature': 'Social Media Hours', 'importance': 11.1},
-            {'feature': 'Current Semester', 'importance': 9.4},
-        ]
+        'students_count': aggregates.overview_stats()['total_students'],
+        'performance_distribution': aggregates.performance_distribution(),
+        'clusters': aggregates.cluster_stats(),
+        'feature_importance': aggregates.feature_importance(),
     }
     return render(request, 'analytics/dashboard.html', context)
 
@@ -55,12 +42,44 @@ def upload_data(request):
     if request.method == 'POST' and request.FILES.get('dataset'):
         file = request.FILES['dataset']
         if file.name.endswith(('.csv', '.xlsx')):
-            messages.success(request, f'Dataset "{file.name}" uploaded successfully! Data preprocessing completed.')
-            return redirect('analytics:dashboard')
+            file_path = _save_upload(file)
+            queue = get_job_queue()
+            ingest_job = queue.enqueue('ingest_dataset', file_path=file_path)
+            queue.enqueue('train_models', file_path=file_path)
+
+            messages.success(request, f'Dataset "{file.name}" uploaded successfully! Processing in the background.')
+            return redirect(f"{reverse('analytics:upload_data')}?job={ingest_job.pk}")
         else:
             messages.error(request, 'Please upload a CSV or Excel file.')
 
-    return render(request, 'analytics/upload.html')
+    job_id = request.GET.get('job', '')
+    return render(request, 'analytics/upload.html', {'job_id': int(job_id) if job_id.isdigit() else None})
+
+def _save_upload(file):
+    """Write an uploaded file under MEDIA_ROOT/uploads and return its path"""
+    upload_dir = os.path.join(settings.MEDIA_ROOT, 'uploads')
+    os.makedirs(upload_dir, exist_ok=True)
+
+    extension = os.path.splitext(file.name)[1]
+    file_path = os.path.join(upload_dir, f"{uuid.uuid4().hex}{extension}")
+    with open(file_path, 'wb') as f:
+        for chunk in file.chunks():
+            f.write(chunk)
+    return file_path
+
+def job_status(request, job_id):
+    """API endpoint to poll the progress of a background job"""
+    job = get_object_or_404(Job, pk=job_id)
+    return JsonResponse({
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.message,
+        'result': job.result,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    })
 
 @csrf_exempt
 def predict_performance(request):
@@ -68,94 +87,80 @@ def predict_performance(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            attendance = float(data.get('attendance', 80))
-            study_hours = float(data.get('studyHours', 3))
-            previous_sgpa = float(data.get('previousSGPA', 3.0))
-
-            # Simple prediction logic based on rules
-            if attendance >= 90 and study_hours >= 4 and previous_sgpa >= 3.5:
-                predicted_category = 'Distinction'
-                confidence = 0.85
-            elif attendance >= 80 and study_hours >= 3 and previous_sgpa >= 3.0:
-                predicted_category = 'First Class'
-                confidence = 0.75
-            elif attendance >= 70 and study_hours >= 2 and previous_sgpa >= 2.5:
-                predicted_category = 'Second Class'
-                confidence = 0.65
-            else:
-                predicted_category = 'Pass'
-                confidence = 0.55
-
-            return JsonResponse({
-                'predicted_category': predicted_category,
-                'confidence': confidence,
-                'cluster': 1 if confidence > 0.75 else 0
-            })
+            predictor = get_predictor()
+            if predictor is None:
+                return JsonResponse({'error': 'No trained model available. Upload a dataset first.'}, status=503)
+
+            result = predictor.predict(data)
+            get_prediction_writer().record([{**result, 'roll_no': data.get('roll_no')}], predictor.version.pk)
+            return JsonResponse(result)
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=400)
 
     return JsonResponse({'error': 'Invalid request method'}, status=405)
 
+def prediction_cache_stats(request):
+    """Hit/miss counters of this process's prediction cache"""
+    return JsonResponse(get_prediction_cache().stats())
+
+def metrics(request):
+    """Request, template and analyzer metrics in the Prometheus text format"""
+    allowed = getattr(settings, 'ANALYTICS_METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@csrf_exempt
+def predict_performance_batch(request):
+    """API endpoint to score a whole cohort from a JSON list or a CSV upload"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Invalid request method'}, status=405)
+
+    try:
+        if request.FILES.get('dataset'):
+            students = pd.read_csv(request.FILES['dataset'])
+        elif request.content_type == 'text/csv':
+            students = pd.read_csv(io.BytesIO(request.body))
+        else:
+            data = json.loads(request.body)
+            records = data.get('students', []) if isinstance(data, dict) else data
+            students = pd.DataFrame.from_records(records)
+
+        if len(students) > MAX_BATCH_SIZE:
+            return JsonResponse({'error': f'Batch too large (max {MAX_BATCH_SIZE:,} students)'}, status=413)
+
+        predictor = get_predictor()
+        if predictor is None:
+            return JsonResponse({'error': 'No trained model available. Upload a dataset first.'}, status=503)
+
+        predictions = predictor.predict_batch(students)
+        get_prediction_writer().record(predictions, predictor.version.pk)
+        return JsonResponse({
+            'count': len(predictions),
+            'model_version': predictor.version.pk,
+            'predictions': predictions,
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
 def association_rules(request):
     """Display association rules analysis"""
-    rules = [
-        {
-            'antecedent': 'High Attendance (≥85%)',
-            'consequent': 'Good Performance',
-            'support': 0.564,
-            'confidence': 0.757,
-            'lift': 1.071,
-            'interpretation': 'Strong relationship'
-        },
-        {
-            'antecedent': 'High Study Hours (≥4)',
-            'consequent': 'High CGPA (≥3.5)',
-            'support': 0.132,
-            'confidence': 0.388,
-            'lift': 1.058,
-            'interpretation': 'Moderate relationship'
-        },
-        {
-            'antecedent': 'Co-curricular Activities',
-            'consequent': 'Better Performance',
-            'support': 0.245,
-            'confidence': 0.682,
-            'lift': 1.125,
-            'interpretation': 'Strong relationship'
-        }
-    ]
+    try:
+        min_support = float(request.GET.get('min_support', 0.05))
+        min_confidence = float(request.GET.get('min_confidence', 0.5))
+        min_lift = float(request.GET.get('min_lift', 1.0))
+    except ValueError:
+        min_support, min_confidence, min_lift = 0.05, 0.5, 1.0
 
+    rules = aggregates.association_rules(min_support, min_confidence, min_lift, 20)
     context = {'rules': rules}
     return render(request, 'analytics/association_rules.html', context)
 
 def clustering_results(request):
     """Display clustering analysis results"""
     context = {
-        'clusters': [
-            {
-                'id': 1,
-                'name': 'High Performers',
-                'count': 551,
-                'avg_cgpa': 3.36,
-                'avg_attendance': 95.0,
-                'characteristics': ['High attendance (>90%)', 'Regular study habits', 'Active in co-curricular']
-            },
-            {
-                'id': 0,
-                'name': 'Average Performers',
-                'count': 596,
-                'avg_cgpa': 3.22,
-                'avg_attendance': 81.5,
-                'characteristics': ['Moderate attendance (70-90%)', 'Average study time', 'Some co-curricular involvement']
-            },
-            {
-                'id': 2,
-                'name': 'Low Performers',
-                'count': 47,
-                'avg_cgpa': 0.21,
-                'avg_attendance': 94.6,
-                'characteristics': ['Irregular study patterns', 'Limited involvement', 'Need intervention']
-            },
-        ]
+        'clusters': aggregates.cluster_stats(),
+        'selection': aggregates.cluster_selection(),
     }
     return render(request, 'analytics/clustering.html', context)
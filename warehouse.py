@@ -0,0 +1,77 @@
+import pandas as pd
+from django.db.models import Max
+
+from .association_mining import TransactionStore
+from .models import AcademicRecord, Student, StudentBehavior
+
+ACADEMIC_FIELDS = ['current_cgpa', 'previous_sgpa', 'credits_completed', 'attendance', 'scholarship', 'performance_category']
+BEHAVIOR_FIELDS = ['study_hours', 'social_media_hours', 'skill_development_hours', 'co_curricular', 'learning_mode']
+STUDENT_FIELDS = ['roll_no', 'age', 'current_semester']
+FETCH_CHUNK_SIZE = 10_000
+
+
+def _latest_per_student(queryset, fields):
+    """One row per student from a fact table, keeping the most recently written row"""
+    columns = ['pk', 'student_id'] + fields
+    rows = queryset.order_by('pk').values_list(*columns).iterator(chunk_size=FETCH_CHUNK_SIZE)
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    return frame.drop_duplicates('student_id', keep='last').drop(columns='pk')
+
+
+def student_frame():
+    """
+    Latest academic record joined with latest behavior record for every student
+    Columns follow the dataset naming used by StudentPerformanceAnalyzer.
+    """
+    academic = _latest_per_student(AcademicRecord.objects.all(), ACADEMIC_FIELDS)
+    behavior = _latest_per_student(StudentBehavior.objects.all(), BEHAVIOR_FIELDS)
+    frame = academic.merge(behavior, on='student_id', how='left')
+    return frame.rename(columns={'performance_category': 'Performance_Category'})
+
+
+def latest_record_pk():
+    """Highest AcademicRecord primary key, or 0 when there are none"""
+    return AcademicRecord.objects.aggregate(latest=Max('pk'))['latest'] or 0
+
+
+def training_frame(after_pk=0, upto_pk=None):
+    """
+    Model training rows for students with academic records in (after_pk, upto_pk]
+    Each student's latest record in that range is joined with their attributes
+    and latest behavior record, so after_pk=0 reads the whole history and a
+    model's watermark reads only what arrived since it was trained.
+    """
+    upto_pk = latest_record_pk() if upto_pk is None else upto_pk
+    return _training_rows(AcademicRecord.objects.filter(pk__gt=after_pk, pk__lte=upto_pk))
+
+
+def superseded_frame(after_pk, upto_pk=None):
+    """
+    The training rows that records in (after_pk, upto_pk] replace
+    For students with records in that range who already had records up to
+    after_pk: their latest record up to after_pk, read as training_frame does
+    (with their current attributes and behavior).
+    """
+    upto_pk = latest_record_pk() if upto_pk is None else upto_pk
+    updated = AcademicRecord.objects.filter(pk__gt=after_pk, pk__lte=upto_pk).values('student_id')
+    return _training_rows(AcademicRecord.objects.filter(pk__lte=after_pk, student_id__in=updated))
+
+
+def _training_rows(records):
+    academic = _latest_per_student(records, ACADEMIC_FIELDS)
+
+    students = Student.objects.filter(pk__in=records.values('student_id'))
+    attributes = pd.DataFrame.from_records(
+        students.values_list('pk', *STUDENT_FIELDS).iterator(chunk_size=FETCH_CHUNK_SIZE),
+        columns=['student_id'] + STUDENT_FIELDS,
+    )
+    behavior = _latest_per_student(
+        StudentBehavior.objects.filter(student__in=students.values('pk')), BEHAVIOR_FIELDS,
+    )
+    frame = academic.merge(attributes, on='student_id', how='inner').merge(behavior, on='student_id', how='left')
+    return frame.rename(columns={'performance_category': 'Performance_Category'})
+
+
+def transaction_store():
+    """Packed item bitsets over every student's latest records, for rule mining"""
+    return TransactionStore.from_frame(student_frame())